@@ -0,0 +1,197 @@
+from fractions import Fraction
+
+from simulation_config import OVERHEAD_KEYS
+from task_set import TaskSet
+from time_base import TimeBase, get_task_values
+from utils import Schedulability, SchedulerType, ceil_div
+
+# Above this number of deadlines to check, the processor demand test gives up
+MAX_DEMAND_CHECKS = 1000000
+
+
+class OverheadModel:
+    """
+    Overheads of the simulator folded into per-job and per-tick costs, in the integer unit of a TimeBase.
+    """
+
+    def __init__(self, overheads, time_base):
+        units = {key: time_base.to_units(overheads[key]) for key in OVERHEAD_KEYS}
+        self.tick_rate = units['Tick_rate']
+        self.get_hpt_overhead = units['Get_hpt']
+        self.add_ready_overhead = units['Add_ready']
+
+        # Charged on every tick: saving the context of the interrupted job, decrementing the timers, looking for the
+        # highest priority job when the processor was idle, loading the context of the resumed job and returning
+        # from the interrupt
+        self.tick_overhead = units['Save'] + units['Decrement_timer'] + units['Get_hpt'] + units['Load'] + \
+            units['Resume']
+        # Only the overheads charged on every tick, whatever the schedule looks like
+        self.min_tick_overhead = units['Decrement_timer'] + units['Resume']
+        # Charged on the tick releasing a job
+        self.release_overhead = units['Restart_timer'] + units['Add_ready']
+        # Charged at most once per job: the end of job overheads and the preemption it may cause on its release
+        self.job_overhead = units['Save'] + units['Load'] + 2 * units['Get_hpt'] + units['Add_ready']
+
+    def get_release_jitter(self, task):
+        """
+        A job is only released by the first tick happening at or after its arrival.
+
+        :return: an upper bound on the delay between the arrival and the release of the jobs of a task
+        """
+        if task.offset % self.tick_rate == 0 and task.period % self.tick_rate == 0:
+            return 0
+        return self.tick_rate
+
+    def get_max_tick_overhead(self, tasks_amount):
+        """
+        :return: the overheads charged on a tick releasing a job of every task and causing a preemption
+        """
+        return self.tick_overhead + self.get_hpt_overhead + self.add_ready_overhead + \
+            tasks_amount * self.release_overhead
+
+    def get_tick_interference(self, duration):
+        # One more tick for the overheads of a tick happening just before the window
+        return (ceil_div(duration, self.tick_rate) + 1) * self.tick_overhead
+
+
+def check_schedulability(task_set: TaskSet, algorithm, overheads):
+    """
+    Analyses a task set with its overheads without simulating it. The sufficient tests are pessimistic, so a task
+    set they do not accept may still be schedulable: only the inconclusive task sets need to be simulated.
+
+    :return: a Schedulability verdict
+    """
+    tasks = task_set.get_tasks()
+    values = [overheads[key] for key in OVERHEAD_KEYS] + [value for task in tasks for value in get_task_values(task)]
+    time_base = TimeBase.from_values(values)
+    model = OverheadModel(overheads, time_base)
+    scaled_tasks = [time_base.scale_task(task) for task in tasks]
+
+    if is_overloaded(scaled_tasks, model):
+        return Schedulability.NOT_SCHEDULABLE
+
+    if algorithm == SchedulerType.RM:
+        schedulable = rm_response_time_analysis(scaled_tasks, model)
+    else:
+        schedulable = edf_processor_demand_test(scaled_tasks, model)
+
+    return Schedulability.SCHEDULABLE if schedulable else Schedulability.INCONCLUSIVE
+
+
+def get_inflated_utilization(tasks, model):
+    """
+    :return: the utilization of the task set including every overhead the simulator may charge
+    """
+    utilization = Fraction(model.tick_overhead, model.tick_rate)
+    for task in tasks:
+        utilization += Fraction(get_inflated_wcet(task, model) + model.release_overhead, task.period)
+    return utilization
+
+
+def is_overloaded(tasks, model):
+    """
+    Checks the necessary conditions: a first job that cannot complete before its deadline, or a utilization above
+    1 when only counting the overheads charged whatever the schedule.
+
+    :return: True if a deadline is missed for sure
+    """
+    if any(task.init_overhead + task.WCET > task.deadline for task in tasks):
+        return True
+
+    # The simulator does not carry over the overheads running past the next tick, the processor time is only
+    # accounted exactly when the overheads of a single tick always fit in it
+    if model.get_max_tick_overhead(len(tasks)) > model.tick_rate:
+        return False
+
+    utilization = Fraction(model.min_tick_overhead, model.tick_rate)
+    for task in tasks:
+        utilization += Fraction(task.WCET + model.release_overhead, task.period)
+    return utilization > 1
+
+
+def get_inflated_wcet(task, model):
+    # The initialization overhead only delays the first job, but counting it for every job keeps the bound safe
+    return task.init_overhead + task.WCET + model.job_overhead
+
+
+def rm_response_time_analysis(tasks, model):
+    """
+    Response time analysis with release jitter. The tick overheads are a highest priority interference and the
+    release overheads of every task, whatever its priority, are charged on the ticks.
+
+    :return: True if every task meets its deadline
+    """
+    by_priority = sorted(tasks, key=lambda task: (task.period, -task.name))
+    for index, task in enumerate(by_priority):
+        higher_priority_tasks = by_priority[:index]
+        wcet = get_inflated_wcet(task, model)
+        limit = task.deadline - model.get_release_jitter(task)
+
+        response_time = wcet
+        while True:
+            interference = model.get_tick_interference(response_time)
+            for other in tasks:
+                releases = ceil_div(response_time + model.get_release_jitter(other), other.period)
+                interference += releases * model.release_overhead
+            for other in higher_priority_tasks:
+                releases = ceil_div(response_time + model.get_release_jitter(other), other.period)
+                interference += releases * get_inflated_wcet(other, model)
+
+            next_response_time = wcet + interference
+            if next_response_time > limit:
+                return False
+            if next_response_time == response_time:
+                break
+            response_time = next_response_time
+
+    return True
+
+
+def edf_processor_demand_test(tasks, model):
+    """
+    Processor demand test with release jitter on the synchronous busy period. The tick and release overheads are
+    added to the demand of the jobs.
+
+    :return: True if every deadline is met
+    """
+    if get_inflated_utilization(tasks, model) >= 1:
+        return False
+
+    busy_period = get_busy_period(tasks, model)
+    check_points = set()
+    for task in tasks:
+        jitter = model.get_release_jitter(task)
+        first = max(task.deadline - jitter, 1)
+        if (busy_period - first) // task.period + len(check_points) > MAX_DEMAND_CHECKS:
+            return False
+        check_points.update(range(first, busy_period + 1, task.period))
+
+    for t in sorted(check_points):
+        demand = model.get_tick_interference(t)
+        for task in tasks:
+            jitter = model.get_release_jitter(task)
+            demand += ceil_div(t + jitter, task.period) * model.release_overhead
+            jobs = (t + jitter - task.deadline) // task.period + 1
+            if jobs > 0:
+                demand += jobs * get_inflated_wcet(task, model)
+        if demand > t:
+            return False
+
+    return True
+
+
+def get_busy_period(tasks, model):
+    """
+    Length of the longest busy period, the utilization including the overheads having to be below 1.
+
+    :return: the length of the synchronous busy period with jitter
+    """
+    busy_period = 1
+    while True:
+        workload = model.get_tick_interference(busy_period)
+        for task in tasks:
+            releases = ceil_div(busy_period + model.get_release_jitter(task), task.period)
+            workload += releases * (get_inflated_wcet(task, model) + model.release_overhead)
+        if workload == busy_period:
+            return busy_period
+        busy_period = workload
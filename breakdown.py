@@ -0,0 +1,171 @@
+import argparse
+
+from analysis import check_schedulability
+from result_cache import simulate
+from simulation_config import OVERHEAD_KEYS, SimulationConfig
+from time_base import to_fraction
+from utils import Schedulability, parse_input_file
+
+# Dimension scaling all the overheads but the tick rate by the same factor
+ALL_OVERHEADS = 'all'
+# Number of doublings of the searched value before giving up finding a deadline miss
+MAX_DOUBLINGS = 64
+# The analytical tests only narrow the search, so they give up earlier
+MAX_ANALYSIS_DOUBLINGS = 8
+
+
+def get_probe_overheads(overheads, dimension, value):
+    """
+    :return: the overheads with the searched dimension set to the given value, a factor for ALL_OVERHEADS
+    """
+    if dimension == ALL_OVERHEADS:
+        return {key: overheads[key] if key == 'Tick_rate' else float(to_fraction(overheads[key]) * value)
+                for key in OVERHEAD_KEYS}
+    return {**overheads, dimension: float(value)}
+
+
+def is_schedulable(task_set, algorithm, overheads, event_driven=False):
+    """
+    Simulates the task set without history, the simulation stopping at the first deadline miss. The probes already
+    simulated, e.g. by an earlier search of another precision, come from the result cache.
+
+    :return: True if all the deadlines are met
+    """
+    config = SimulationConfig.from_overheads(overheads, algorithm)
+    (missed_deadline, _), _ = simulate(task_set, config, event_driven=event_driven)
+    return not missed_deadline
+
+
+def search_steps(is_met, steps, smallest, low=None, high=None, doublings=MAX_DOUBLINGS):
+    """
+    Searches the breakdown point of a predicate over integer steps, assumed true below it and false above it. The
+    bracket [low, high] is first completed by a galloping search from steps, then bisected.
+
+    :return: the largest step meeting the predicate, None if even the smallest one does not, and the smallest step
+    not meeting it, None if all the steps up to the given number of doublings meet it
+    """
+    if (low is None or low < steps) and (high is None or steps < high):
+        if is_met(steps):
+            low = steps
+        else:
+            high = steps
+
+    if high is None:
+        start = low
+        high = max(2 * low, 1)
+        while is_met(high):
+            if high > max(start, 1) << doublings:
+                return high, None
+            low, high = high, 2 * high
+    if low is None:
+        low = high // 2
+        while low > smallest and not is_met(low):
+            low, high = low // 2, low
+        low = max(low, smallest)
+        if not is_met(low):
+            return None, low
+
+    while high - low > 1:
+        middle = (low + high) // 2
+        if is_met(middle):
+            low = middle
+        else:
+            high = middle
+    return low, high
+
+
+def find_breakdown(task_set, algorithm, overheads, dimension, precision, use_analysis=True, event_driven=False):
+    """
+    Searches the largest value of an overhead, of the tick rate or of a factor scaling all the overheads for which
+    all the deadlines are met, assuming they are met below this breakdown point and missed above it. The values are
+    multiples of the precision, searched from the value of the input file.
+
+    The analytical tests are cheap compared to a simulation: the largest value they prove schedulable and the
+    smallest one they prove overloaded are searched first, and only the values in between are simulated.
+
+    :return: the largest value meeting the deadlines (None if even the smallest one misses a deadline), the smallest
+    value missing one, and the list of probes as (value, verdict, source), the verdict being None when the analysis
+    is inconclusive
+    """
+    precision = to_fraction(precision)
+    if precision <= 0:
+        raise Exception("The precision must be positive")
+    if dimension == ALL_OVERHEADS and all(overheads[key] == 0 for key in OVERHEAD_KEYS if key != 'Tick_rate'):
+        raise Exception("All the overheads are null, scaling them has no effect")
+
+    # The verdicts are indexed by the number of precision steps of the value
+    analysis_verdicts = {}
+    simulation_verdicts = {}
+    probes = []
+
+    def get_verdict(steps):
+        if steps not in analysis_verdicts:
+            value = steps * precision
+            verdict = check_schedulability(task_set, algorithm, get_probe_overheads(overheads, dimension, value))
+            analysis_verdicts[steps] = verdict
+            probes.append((float(value), None if verdict == Schedulability.INCONCLUSIVE else
+                           verdict == Schedulability.SCHEDULABLE, 'analysis'))
+        return analysis_verdicts[steps]
+
+    def is_met(steps):
+        if steps not in simulation_verdicts:
+            value = steps * precision
+            met = is_schedulable(task_set, algorithm, get_probe_overheads(overheads, dimension, value), event_driven)
+            simulation_verdicts[steps] = met
+            probes.append((float(value), met, 'simulation'))
+        return simulation_verdicts[steps]
+
+    initial_value = 1 if dimension == ALL_OVERHEADS else to_fraction(overheads[dimension])
+    steps = max(1, round(initial_value / precision))
+    # The tick rate cannot be null, unlike the overheads
+    smallest = 1 if dimension == 'Tick_rate' else 0
+
+    low = high = None
+    if use_analysis:
+        # Without overheads, or with the finest tick, the tests are the most likely to conclude
+        if get_verdict(smallest) == Schedulability.SCHEDULABLE:
+            low, _ = search_steps(lambda steps: get_verdict(steps) == Schedulability.SCHEDULABLE, steps, smallest,
+                                  low=smallest, doublings=MAX_ANALYSIS_DOUBLINGS)
+        _, high = search_steps(lambda steps: get_verdict(steps) != Schedulability.NOT_SCHEDULABLE, steps, smallest,
+                               low=low, doublings=MAX_ANALYSIS_DOUBLINGS)
+
+    low, high = search_steps(is_met, steps, smallest, low, high)
+    if high is None:
+        raise Exception(f"No deadline is missed up to {dimension} = {float(low * precision)}")
+    return None if low is None else float(low * precision), float(high * precision), probes
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Searches the largest overhead, tick rate or factor of all the "
+                                                 "overheads for which a task set meets all its deadlines")
+    parser.add_argument("-input", help="Filename of the system settings", required=True)
+    parser.add_argument("-overhead",
+                        choices=OVERHEAD_KEYS + [ALL_OVERHEADS],
+                        required=True,
+                        help="Overhead of the input file to search, Tick_rate for the coarsest tick rate, or all to "
+                             "scale all the overheads but the tick rate by the same factor")
+    parser.add_argument("-precision",
+                        type=float,
+                        default=0.01,
+                        help="Precision of the result, the searched values being multiples of it")
+    parser.add_argument("-events",
+                        help="Use the event-driven engine which skips the ticks where nothing can happen",
+                        action="store_true")
+    parser.add_argument("-simulate",
+                        help="Simulate every probe instead of using the analytical tests when they are conclusive",
+                        action="store_true")
+    args = parser.parse_args()
+    if args.precision <= 0:
+        parser.error("-precision expects a positive value")
+
+    task_set, algorithm, overheads = parse_input_file(args.input)
+    met_value, missed_value, probes = find_breakdown(task_set, algorithm, overheads, args.overhead, args.precision,
+                                                     not args.simulate, args.events)
+
+    name = "factor of all the overheads" if args.overhead == ALL_OVERHEADS else args.overhead
+    if met_value is None:
+        print(f"A deadline is missed with every {name} down to {missed_value}")
+    else:
+        print(f"The largest {name} meeting all the deadlines is {met_value}, a deadline is missed with {missed_value}")
+    simulations = sum(1 for _, _, source in probes if source == 'simulation')
+    print(f"{len(probes)} probes: {simulations} simulations and {len(probes) - simulations} analyses")
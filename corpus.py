@@ -0,0 +1,196 @@
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import zipfile
+from array import array
+
+from simulation_config import OVERHEAD_KEYS
+from time_base import get_task_values
+from utils import SchedulerType, create_task_set, is_corpus, parse_input_file
+
+# Number of scenarios read at once from the columns of a binary corpus
+DEFAULT_CHUNK_SIZE = 4096
+# Columns of a binary corpus: name, NumPy type code and number of values per row
+NPZ_COLUMNS = [('task_counts', 'i4', 1), ('algorithms', 'i1', 1), ('overheads', 'f8', len(OVERHEAD_KEYS)),
+               ('tasks', 'f8', 5)]
+
+
+def parse_scenario(scenario):
+    """
+    Reads a scenario given as a dictionary with the parameters of the tasks in the order of the input file, the name
+    of the algorithm and the overheads indexed by their name in the input file.
+
+    :return: (TaskSet, SchedulerType, overheads)
+    """
+    known_schedulers = [scheduler.name for scheduler in SchedulerType]
+    algorithm_text = str(scenario['algorithm']).upper()
+    if algorithm_text not in known_schedulers:
+        raise Exception(f"Unknown scheduling algorithm {scenario['algorithm']}, known are {known_schedulers}")
+
+    missing = [key for key in OVERHEAD_KEYS if key not in scenario['overheads']]
+    if missing:
+        raise Exception(f"Missing overheads {missing}")
+    overheads = {key: float(scenario['overheads'][key]) for key in OVERHEAD_KEYS}
+
+    return create_task_set(scenario['tasks']), SchedulerType[algorithm_text], overheads
+
+
+def get_scenario_dict(task_set, algorithm, overheads):
+    """
+    :return: the scenario as a dictionary, the inverse of parse_scenario
+    """
+    return {'tasks': [get_task_values(task) for task in task_set.get_tasks()],
+            'algorithm': algorithm.name,
+            'overheads': {key: overheads[key] for key in OVERHEAD_KEYS}}
+
+
+def read_corpus(filename, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Reads the scenarios of a JSONL or NPZ corpus lazily, only a chunk of the corpus being in memory at once.
+
+    :return: a generator of (TaskSet, SchedulerType, overheads)
+    """
+    if filename.endswith('.npz'):
+        return read_npz_corpus(filename, chunk_size)
+    return read_jsonl_corpus(filename)
+
+
+def read_jsonl_corpus(filename):
+    with open(filename) as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                yield parse_scenario(json.loads(line))
+            except Exception as e:
+                raise Exception(f"Invalid scenario on line {line_number} of {filename}: {e}") from e
+
+
+def read_npz_corpus(filename, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    The columns of the NPZ file are read as streams from the archive, so that the arrays are never loaded whole.
+    """
+    with zipfile.ZipFile(filename) as archive:
+        columns = {name: NpyRowReader(archive, name, values_amount) for name, _, values_amount in NPZ_COLUMNS}
+
+        while True:
+            task_counts = columns['task_counts'].read(chunk_size)
+            if len(task_counts) == 0:
+                return
+            algorithms = columns['algorithms'].read(chunk_size)
+            overheads = columns['overheads'].read(chunk_size)
+            task_rows = columns['tasks'].read(int(task_counts.sum())).tolist()
+
+            first = 0
+            for count, algorithm, overhead_values in zip(task_counts.tolist(), algorithms.tolist(),
+                                                         overheads.tolist()):
+                yield (create_task_set(task_rows[first:first + count]), SchedulerType(algorithm),
+                       dict(zip(OVERHEAD_KEYS, overhead_values)))
+                first += count
+
+
+class NpyRowReader:
+    """
+    Reads the rows of a C-ordered array stored in an NPZ archive one block at a time.
+    """
+
+    def __init__(self, archive, name, values_amount):
+        import numpy as np
+
+        self.file = archive.open(name + '.npy')
+        version = np.lib.format.read_magic(self.file)
+        if version == (1, 0):
+            shape, fortran_order, self.dtype = np.lib.format.read_array_header_1_0(self.file)
+        else:
+            shape, fortran_order, self.dtype = np.lib.format.read_array_header_2_0(self.file)
+        if fortran_order:
+            raise Exception(f"The array {name} of the corpus must be stored in C order")
+        self.values_amount = values_amount
+        self.remaining_rows = shape[0]
+
+    def read(self, rows_amount):
+        import numpy as np
+
+        rows_amount = min(rows_amount, self.remaining_rows)
+        self.remaining_rows -= rows_amount
+        data = self.file.read(rows_amount * self.values_amount * self.dtype.itemsize)
+        values = np.frombuffer(data, dtype=self.dtype)
+        return values if self.values_amount == 1 else values.reshape(-1, self.values_amount)
+
+
+def write_corpus(filename, scenarios):
+    """
+    Writes scenarios given as (TaskSet, SchedulerType, overheads) to a JSONL or NPZ corpus while they are produced.
+
+    :return: the number of scenarios written
+    """
+    if filename.endswith('.npz'):
+        return write_npz_corpus(filename, scenarios)
+    return write_jsonl_corpus(filename, scenarios)
+
+
+def write_jsonl_corpus(filename, scenarios):
+    scenarios_amount = 0
+    with open(filename, 'w') as f:
+        for task_set, algorithm, overheads in scenarios:
+            f.write(json.dumps(get_scenario_dict(task_set, algorithm, overheads)) + "\n")
+            scenarios_amount += 1
+    return scenarios_amount
+
+
+def write_npz_corpus(filename, scenarios):
+    """
+    The rows of every column are first appended to a temporary file, the size of the arrays being needed in the
+    headers of the NPZ file, and the columns are then copied to a compressed archive.
+    """
+    import numpy as np
+
+    with tempfile.TemporaryDirectory() as directory:
+        files = {name: open(os.path.join(directory, name), 'w+b') for name, _, _ in NPZ_COLUMNS}
+        rows = {name: 0 for name, _, _ in NPZ_COLUMNS}
+        typecodes = {'i4': 'i', 'i1': 'b', 'f8': 'd'}
+
+        for task_set, algorithm, overheads in scenarios:
+            tasks = task_set.get_tasks()
+            values = {'task_counts': [len(tasks)], 'algorithms': [algorithm.value],
+                      'overheads': [overheads[key] for key in OVERHEAD_KEYS],
+                      'tasks': [value for task in tasks for value in get_task_values(task)]}
+            for name, code, _ in NPZ_COLUMNS:
+                files[name].write(array(typecodes[code], values[name]).tobytes())
+            rows['task_counts'] += 1
+            rows['tasks'] += len(tasks)
+        rows['algorithms'] = rows['overheads'] = rows['task_counts']
+
+        with zipfile.ZipFile(filename, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+            for name, code, values_amount in NPZ_COLUMNS:
+                shape = (rows[name],) if values_amount == 1 else (rows[name], values_amount)
+                header = {'descr': np.dtype(code).newbyteorder('=').str, 'fortran_order': False, 'shape': shape}
+                with archive.open(name + '.npy', 'w', force_zip64=True) as member:
+                    np.lib.format.write_array_header_1_0(member, header)
+                    files[name].seek(0)
+                    shutil.copyfileobj(files[name], member)
+                files[name].close()
+
+    return rows['task_counts']
+
+
+def convert_text_files(filenames, output):
+    """
+    Gathers input files of the text format into a corpus, in the given order.
+
+    :return: the number of scenarios written
+    """
+    return write_corpus(output, (parse_input_file(filename) for filename in filenames))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Converts input files of the text format to a JSONL or NPZ corpus")
+    parser.add_argument("-output", help="Filename of the corpus, its extension giving its format", required=True)
+    parser.add_argument("inputs", nargs='+', metavar='INPUT', help="Filenames of the input files")
+    args = parser.parse_args()
+
+    if not is_corpus(args.output):
+        parser.error(f"The corpus filename must end with one of {CORPUS_EXTENSIONS}")
+    print(convert_text_files(args.inputs, args.output), "scenarios were written to", args.output)
@@ -1,16 +1,31 @@
 import matplotlib.pyplot as plt
-from math import sqrt, floor
 
 import numpy as np
+from matplotlib.collections import PatchCollection, PolyCollection
+from matplotlib.colors import to_rgb
 from matplotlib.font_manager import FontProperties
-from matplotlib.patches import Ellipse
+from matplotlib.patches import Ellipse, Patch
+from matplotlib.path import Path
+from matplotlib.ticker import MultipleLocator
 
-from task import IDLE_TASK
-from utils import ExecutionType, PHI
+from drawing_style import LABELED_OVERHEADS, MAX_GRADUATED_INTERVAL, X_LABELS_AMOUNT, get_color, get_first_instant, \
+    get_round_step
+from level_of_detail import bin_history
+from task import IDLE_TASK, TICK_TASK
+from utils import ExecutionType
 
 
 def draw_schedule(history, task_set, tick_rate, filename, show_tick, show_hyperperiod, show_overheads_labels,
-                  interval=-1):
+                  interval=-1, start=0, exact=False):
+    """
+    Draws the window [start, interval] of the schedule. The history only needs to hold the entries of the window,
+    the time axis and the markers use absolute times.
+
+    Unless exact is set, a window too long for the ticks to span a few pixels is drawn from the schedule aggregated
+    per pixel, so the drawing time depends on the size of the image and not on the length of the history.
+
+    :return: the filename of the image
+    """
     tasks = task_set.get_tasks()
     if interval == -1:
         feasibility_interval = task_set.feasibility_interval
@@ -28,159 +43,236 @@ def draw_schedule(history, task_set, tick_rate, filename, show_tick, show_hyperp
     x_lim = feasibility_interval
     y_lim = tasks_amount * 100
     task_height = (y_lim / tasks_amount)
-    set_axis_limits(gnt, x_lim, y_lim)
+    set_axis_limits(gnt, start, x_lim, y_lim)
 
     # Setting labels for x-axis and y-axis
     gnt.set_xlabel('')
     gnt.set_ylabel('')
 
-    set_ticks_on_x_axis(gnt, x_lim)
+    set_ticks_on_x_axis(gnt, start, x_lim)
     set_ticks_on_y_axis(gnt, tasks_amount, y_lim, task_height)
     set_y_ticks_labels(gnt, tasks, tasks_amount)
 
     gnt.xaxis.grid(True, linestyle='--', lw=1.15, alpha=0.7, color='black')
     gnt.yaxis.grid(True, color='black', lw=1)
 
-    draw_periods_and_deadlines(feasibility_interval, gnt, task_height, tasks, x_lim)
+    bins_amount = int(gnt.bbox.width)
+    pixels_per_unit = bins_amount / (x_lim - start)
+    detailed = exact or tick_rate * pixels_per_unit >= MIN_TICK_PIXELS
+    # When aggregated, the markers closer than a few pixels to each other are not drawn
+    min_spacing = 0 if detailed else MIN_MARKER_PIXELS / pixels_per_unit
 
-    if show_tick:
-        draw_ticks(feasibility_interval, gnt, tick_rate)
+    draw_periods_and_deadlines(start, feasibility_interval, gnt, task_height, tasks, min_spacing)
 
-    if show_hyperperiod:
-        draw_hyperperiods(gnt, task_set)
+    if show_tick and tick_rate >= min_spacing:
+        draw_ticks(start, feasibility_interval, gnt, tick_rate)
 
-    draw_tasks(gnt, history, show_overheads_labels, task_height, x_lim, y_lim)
-    plt.savefig(filename + ".png", bbox_inches='tight')
+    if show_hyperperiod and task_set.hyperperiod >= min_spacing:
+        draw_hyperperiods(start, feasibility_interval, gnt, task_set)
 
+    if detailed:
+        draw_tasks(gnt, history, show_overheads_labels, task_height, x_lim, y_lim)
+    else:
+        draw_binned_tasks(gnt, bin_history(history, start, x_lim, bins_amount), tasks, task_height)
+    # Saving through the figure avoids the redraw pyplot does after saving
+    fig.savefig(filename + ".png", bbox_inches='tight')
+    # Releasing the figure keeps the memory bounded when many images are drawn by the same process
+    plt.close(fig)
+    return filename + ".png"
+
+
+# Style of the hatched layer of the overheads: its properties, legend label and whether it spans all the rows
+OVERHEAD_STYLES = {
+    ExecutionType.TICK_OVERHEAD: (dict(color='none', hatch='X'), "Tick overhead", True),
+    ExecutionType.PREEMPTION_OVERHEAD: (dict(color='none', hatch='-'), "Preemption overhead", True),
+    ExecutionType.INIT_OVERHEAD: (dict(color='none', hatch='//'), "Initialization overhead", False),
+    ExecutionType.END_JOB_OVERHEAD: (dict(facecolor='none', hatch='\\\\'), "End of job overhead", False),
+}
+# Below this width of a tick in pixels, the schedule is aggregated per pixel instead of drawn entry by entry
+MIN_TICK_PIXELS = 4
+# Below this distance in pixels, the markers are not drawn on an aggregated schedule
+MIN_MARKER_PIXELS = 12
+# Fraction of the height of a row used by the overheads strip of an aggregated schedule
+OVERHEAD_STRIP_HEIGHT = 0.3
+JOB_OVERHEADS = [ExecutionType.INIT_OVERHEAD, ExecutionType.END_JOB_OVERHEAD]
+SCHEDULER_OVERHEADS = [ExecutionType.TICK_OVERHEAD, ExecutionType.PREEMPTION_OVERHEAD]
+# Distance in points between the markers and the point they are attached to
+ARROW_SHRINK = 2
+# Width in points of the base of the tick wedges
+TICK_WEDGE_WIDTH = 9
+# Size in points of the overheads labels
+LABEL_FONT_SIZE = 10.2
+# Open head of the release arrows, in points with the tip at the origin
+RELEASE_ARROW_HEAD = Path([(-5, 10), (0, 0), (5, 10)], [Path.MOVETO, Path.LINETO, Path.LINETO])
 
-def draw_tasks(gnt, history, show_overheads_labels, task_height, x_lim, y_lim):
-    cpu_time = 0
-    init_overhead_legend = False
-    tick_overhead_legend = False
-    preemption_overhead_legend = False
-    endofjob_overhead_legend = False
-    missed_deadline_legend = False
 
-    for idx, task_entry in enumerate(history):
-        task_id = task_entry[0]
-        used_time = task_entry[1]
+def draw_tasks(gnt, history, show_overheads_labels, task_height, x_lim, y_lim):
+    """
+    Draws the entries of the history. The bars are gathered by task and execution type first, and each group is
+    drawn as a single collection, matplotlib being much slower at creating artists than at drawing them.
+    """
+    bars = {}
+    # A vertical label is as wide as its font is high, the labels closer than that to the previous label of their row
+    # would overlap and are skipped, so the number of texts is bounded by the width of the image
+    label_width = LABEL_FONT_SIZE * get_point_size(gnt)[0]
+    next_label_times = {}
+
+    for idx in range(len(history)):
+        used_time = history.durations[idx]
 
         if used_time <= 0:
             continue
 
-        exec_type = task_entry[2]
-        color = get_color(task_entry)
+        task_id = int(history.task_ids[idx])
+        exec_type = ExecutionType(history.execution_types[idx])
+        cpu_time = history.starts[idx]
+
         if exec_type == ExecutionType.MISSED_DEADLINE:
-            deadline_missed_at = int(task_entry[3])
-        else:
-            if len(task_entry) > 3:
-                overhead_label = task_entry[3]
-            else:
-                overhead_label = ""
-
-        if exec_type == ExecutionType.TICK_OVERHEAD:
-            start = 0
-            gnt.broken_barh([(cpu_time, used_time)], (start, y_lim), color='none', alpha=0.5, edgecolor='black', lw=0.8,
-                            hatch='X', zorder=4, label="Tick overhead" if not tick_overhead_legend else "")
-            gnt.broken_barh([(cpu_time, used_time)], (start, y_lim), facecolor=color, alpha=0.1, edgecolor='black',
-                            zorder=5)
-            tick_overhead_legend = True
-            display_overhead_label(cpu_time, gnt, overhead_label, show_overheads_labels, start, task_height, used_time,
-                                   x_lim, y_lim, ExecutionType.TICK_OVERHEAD)
-        elif exec_type == ExecutionType.PREEMPTION_OVERHEAD:
-            start = 0
-            gnt.broken_barh([(cpu_time, used_time)], (start, y_lim), color='none', alpha=0.5, edgecolor='black', lw=0.8,
-                            hatch='-', zorder=4,
-                            label="Preemption overhead" if not preemption_overhead_legend else "")
-            gnt.broken_barh([(cpu_time, used_time)], (start, y_lim), facecolor=color, alpha=0.1, edgecolor='black',
-                            zorder=5)
-            preemption_overhead_legend = True
-            display_overhead_label(cpu_time, gnt, overhead_label, show_overheads_labels, start, task_height, used_time,
-                                   x_lim, y_lim, ExecutionType.PREEMPTION_OVERHEAD)
-        elif exec_type == ExecutionType.INIT_OVERHEAD:
-            start = task_id * task_height
-            gnt.broken_barh([(cpu_time, used_time)], (start, task_height), color='none', alpha=0.5, edgecolor='black',
-                            lw=0.8,
-                            hatch='//', zorder=4, label="Initialization overhead" if not init_overhead_legend else "")
-            gnt.broken_barh([(cpu_time, used_time)], (start, task_height), facecolor=color, alpha=0.1,
-                            edgecolor='black',
-                            zorder=5)
-            init_overhead_legend = True
-        elif exec_type == ExecutionType.END_JOB_OVERHEAD:
-            start = task_id * task_height
-            gnt.broken_barh([(cpu_time, used_time)], (start, task_height), facecolor='none', alpha=0.5,
-                            edgecolor='black', lw=0.8,
-                            hatch='\\\\', zorder=4, label="End of job overhead" if not endofjob_overhead_legend else "")
-            gnt.broken_barh([(cpu_time, used_time)], (start, task_height), facecolor=color, alpha=0.1,
-                            edgecolor='black',
-                            zorder=5)
-            endofjob_overhead_legend = True
-            display_overhead_label(cpu_time, gnt, overhead_label, show_overheads_labels, start, task_height, used_time,
-                                   x_lim, y_lim, ExecutionType.END_JOB_OVERHEAD)
-        elif exec_type == ExecutionType.MISSED_DEADLINE:
-            start = task_id * task_height
-            # if cpu_time <= deadline_missed_at:
-            #     cpu_time += (deadline_missed_at - cpu_time)
-
-            gnt.broken_barh([(deadline_missed_at, used_time)], (start, task_height), color='red', alpha=0.8, edgecolor='black',
-                            hatch='x*', zorder=4, lw=2, label="Deadline missed" if not missed_deadline_legend else "")
-            gnt.broken_barh([(deadline_missed_at, used_time)], (start, task_height), facecolor=color, alpha=0.1,
-                            edgecolor='black',
-                            zorder=5)
+            deadline_missed_at = int(history.get_label(idx))
+            bars.setdefault((task_id, exec_type), []).append((deadline_missed_at, used_time))
             break
-        else:
-            if task_id == IDLE_TASK:
-                start = 0
-            else:
-                start = task_id * task_height
-            gnt.broken_barh([(cpu_time, used_time)], (start, task_height), facecolor=color, zorder=1)
 
-        cpu_time += used_time
+        bars.setdefault((task_id, exec_type), []).append((cpu_time, used_time))
+        if exec_type in LABELED_OVERHEADS and show_overheads_labels:
+            start = 0 if OVERHEAD_STYLES[exec_type][2] else task_id * task_height
+            row = (start, exec_type == ExecutionType.END_JOB_OVERHEAD)
+            if cpu_time >= next_label_times.get(row, cpu_time):
+                display_overhead_label(cpu_time, gnt, history.get_label(idx), show_overheads_labels, start,
+                                       task_height, used_time, x_lim, y_lim, exec_type)
+                next_label_times[row] = cpu_time + label_width
+
+    legends = set()
+    for (task_id, exec_type), xranges in bars.items():
+        color = get_color(task_id, exec_type)
+        if exec_type in OVERHEAD_STYLES:
+            style, label, full_height = OVERHEAD_STYLES[exec_type]
+            yrange = (0, y_lim) if full_height else (task_id * task_height, task_height)
+            # The first group of each overhead gives its entry to the legend
+            gnt.broken_barh(xranges, yrange, **style, alpha=0.5, edgecolor='black', lw=0.8, zorder=4,
+                            label=label if exec_type not in legends else "")
+            gnt.broken_barh(xranges, yrange, facecolor=color, alpha=0.1, edgecolor='black', zorder=5)
+            legends.add(exec_type)
+        elif exec_type == ExecutionType.MISSED_DEADLINE:
+            yrange = (task_id * task_height, task_height)
+            gnt.broken_barh(xranges, yrange, color='red', alpha=0.8, edgecolor='black', hatch='x*', zorder=4, lw=2,
+                            label="Deadline missed")
+            gnt.broken_barh(xranges, yrange, facecolor=color, alpha=0.1, edgecolor='black', zorder=5)
+        else:
+            yrange = (0, task_height) if task_id == IDLE_TASK else (task_id * task_height, task_height)
+            gnt.broken_barh(xranges, yrange, facecolor=color, zorder=1)
 
     # update the legend
-    if init_overhead_legend or tick_overhead_legend or missed_deadline_legend or preemption_overhead_legend:
+    if legends & {ExecutionType.INIT_OVERHEAD, ExecutionType.TICK_OVERHEAD, ExecutionType.PREEMPTION_OVERHEAD}:
         plt.legend(bbox_to_anchor=(0., 1.02, 1., .102), loc='lower left', mode="expand", borderaxespad=0.)
 
 
-def draw_hyperperiods(gnt, task_set):
+def draw_binned_tasks(gnt, bins, tasks, task_height):
+    """
+    Draws the aggregated schedule as heat strips. On the row of a task, the upper strip is darker as the task
+    executes longer in the bin and the lower strip as its overheads last longer. On the row of the idle task, the
+    lower strip shows the tick and preemption overheads.
+    """
+    for task in tasks:
+        task_id = task.name
+        if task_id == IDLE_TASK:
+            row = 0
+            overheads = bins.get_fraction(TICK_TASK, SCHEDULER_OVERHEADS)
+        else:
+            row = task_id * task_height
+            overheads = bins.get_fraction(task_id, JOB_OVERHEADS)
+        split = row + OVERHEAD_STRIP_HEIGHT * task_height
+
+        busy = bins.get_fraction(task_id, [ExecutionType.TASK])
+        draw_heat_strip(gnt, busy, get_color(task_id, ExecutionType.TASK), bins, split, row + task_height)
+        draw_heat_strip(gnt, overheads, 'black', bins, row, split)
+
+    handles = [Patch(facecolor='black', alpha=0.5, label="Overheads, darker when longer")]
+    if bins.missed_deadlines:
+        task_id, deadline = bins.missed_deadlines[0]
+        gnt.vlines(deadline, task_id * task_height, (task_id + 1) * task_height, colors='red', lw=3, zorder=6)
+        handles.append(Patch(facecolor='red', label="Deadline missed"))
+    plt.legend(handles=handles, bbox_to_anchor=(0., 1.02, 1., .102), loc='lower left', mode="expand",
+               borderaxespad=0.)
+
+
+def draw_heat_strip(gnt, fraction, color, bins, bottom, top):
+    # One pixel per bin, the opacity of the color being the fraction of the bin
+    pixels = np.zeros((1, len(fraction), 4))
+    pixels[0, :, :3] = to_rgb(color)
+    pixels[0, :, 3] = fraction
+    gnt.imshow(pixels, extent=(bins.start, bins.end, bottom, top), aspect='auto', interpolation='nearest', zorder=1)
+
+
+def draw_hyperperiods(start, end, gnt, task_set):
     # Draw hyperperiods
-    for t in range(0, 100, task_set.hyperperiod):
+    for t in range(get_first_instant(start, 0, task_set.hyperperiod), end + 1, task_set.hyperperiod):
         gnt.annotate('',
                      xy=(t, 0), xycoords='data',
                      xytext=(t, -20), textcoords='data',
                      arrowprops=dict(arrowstyle='fancy', lw=1.5, zorder=9, clip_on=False))
 
 
-def draw_ticks(feasibility_interval, gnt, tick_rate):
-    # Draw tick interrupts
-    for t in np.arange(tick_rate, feasibility_interval + 1, tick_rate):
-        gnt.annotate('',
-                     xy=(t, 30), xycoords='data',
-                     xytext=(t, 0), textcoords='data',
-                     arrowprops=dict(arrowstyle='wedge', lw=2, mutation_scale=30, zorder=10, facecolor='black'))
+def draw_ticks(start, feasibility_interval, gnt, tick_rate):
+    # Draw tick interrupts, as upward wedges gathered in a single collection
+    first_tick = max(tick_rate, np.ceil(start / tick_rate) * tick_rate)
+    ticks = np.arange(first_tick, feasibility_interval + 1, tick_rate)
+    point_x, point_y = get_point_size(gnt)
 
+    wedges = np.empty((len(ticks), 3, 2))
+    wedges[:, 0, 0] = ticks - TICK_WEDGE_WIDTH / 2 * point_x
+    wedges[:, 1, 0] = ticks + TICK_WEDGE_WIDTH / 2 * point_x
+    wedges[:, 2, 0] = ticks
+    wedges[:, :2, 1] = ARROW_SHRINK * point_y
+    wedges[:, 2, 1] = 30 - ARROW_SHRINK * point_y
+    gnt.add_collection(PolyCollection(wedges, facecolor='black', edgecolor='black', lw=2, joinstyle='round',
+                                      zorder=10, clip_on=False), autolim=False)
 
-def draw_periods_and_deadlines(feasibility_interval, gnt, task_height, tasks, x_lim):
+
+def draw_periods_and_deadlines(start_time, feasibility_interval, gnt, task_height, tasks, min_spacing=0):
+    releases = []
+    deadlines = []
     for idx, task in enumerate(tasks[:-1]):
         task_id = task.name
         start = (task_id + 1) * task_height
         period = int(task.period)
         deadline = int(task.deadline)
         offset = int(task.offset)
+        if period < min_spacing:
+            continue
+
+        for t in range(get_first_instant(start_time, offset, period), feasibility_interval + 1, period):
+            releases.append((t, start))
+
+        first_deadline = get_first_instant(start_time, offset + deadline, period)
+        for t in range(first_deadline, feasibility_interval + 1, period):
+            deadlines.append(Ellipse((t, start), width=(feasibility_interval - start_time) / 75, height=15))
 
-        # Draw downward arrows every period
-        for t in range(offset, feasibility_interval + 1, period):
-            gnt.annotate('',
-                         xy=(t, start - 50), xycoords='data',
-                         xytext=(t, start), textcoords='data',
-                         arrowprops=dict(arrowstyle='->', lw=2.5, mutation_scale=25, zorder=9))
+    # Draw downward arrows every period, the shafts and the heads being each drawn as a single artist
+    point_x, point_y = get_point_size(gnt)
+    releases = np.array(releases).reshape(-1, 2)
+    tops = releases[:, 1] - ARROW_SHRINK * point_y
+    # The tip is moved back by half the line width for the stroke to end on the shrunk point
+    tips = releases[:, 1] - 50 + (ARROW_SHRINK + 2.5 / 2) * point_y
+    gnt.vlines(releases[:, 0], tips, tops, colors='black', lw=2.5, zorder=9, clip_on=False, snap=False)
+    heads, = gnt.plot(releases[:, 0], tips, linestyle='none', marker=RELEASE_ARROW_HEAD, markersize=20,
+                      markeredgewidth=2.5, markerfacecolor='none', markeredgecolor='black', zorder=9, clip_on=False)
+    # The extent of markers is padded, it would enlarge the saved image
+    heads.set_in_layout(False)
 
-        # Draw circles every deadline
-        for t in range(offset + deadline, feasibility_interval + 1, period):
-            # gnt.add_patch(plt.Circle((t, start), radius=2, fill=False, ec='black'))
-            gnt.add_patch(
-                Ellipse((t, start), width=x_lim / 75, height=15, lw=2, clip_on=False, fill=False, ec='black',
-                        zorder=10))
+    # Draw circles every deadline
+    gnt.add_collection(PatchCollection(deadlines, facecolor='none', edgecolor='black', lw=2, zorder=10,
+                                       clip_on=False), autolim=False)
+
+
+def get_point_size(gnt):
+    """
+    The markers are sized in points like the annotations they replace, the layout of the axes being already fixed.
+
+    :return: the size of a typographic point in data units along the x axis and the y axis
+    """
+    pixels = gnt.figure.dpi / 72
+    (x0, y0), (x1, y1) = gnt.transData.inverted().transform([(0, 0), (pixels, pixels)])
+    return x1 - x0, y1 - y0
 
 
 def set_y_ticks_labels(gnt, tasks, tasks_amount):
@@ -214,12 +306,21 @@ def set_ticks_on_y_axis(gnt, tasks_amount, y_lim, task_height):
             tickLine.set_linestyle('None')
 
 
-def set_ticks_on_x_axis(gnt, x_lim):
+def set_ticks_on_x_axis(gnt, start, x_lim):
     # Setting ticks on x-axis
     gnt.tick_params(axis='x', which='major', length=5, width=1, direction='out', pad=10)
     gnt.tick_params(axis='x', which='minor', length=3, width=2, direction='out')
+    if x_lim - start > MAX_GRADUATED_INTERVAL:
+        # A graduation on every time unit would be unreadable and slow to draw, a round step is used instead
+        step = get_round_step((x_lim - start) / X_LABELS_AMOUNT)
+        gnt.xaxis.set_major_locator(MultipleLocator(step))
+        gnt.xaxis.set_minor_locator(MultipleLocator(step / 5))
+        gnt.tick_params(axis='x', which='major', length=15, width=1.2)
+        gnt.tick_params(axis='x', which='minor', length=8, width=1)
+        return
+
     # set the tick labels
-    xticks = range(x_lim + 1)
+    xticks = range(start, x_lim + 1)
     # set tick locations and labels for every fifth tick
     tick_labels = ['' if i % 5 != 0 else str(i) for i in xticks]
     gnt.set_xticks(xticks)
@@ -245,11 +346,11 @@ def set_fig_properties():
     plt.rcParams.update(params)
 
 
-def set_axis_limits(gnt, x_lim, y_lim):
+def set_axis_limits(gnt, start, x_lim, y_lim):
     # Setting Y-axis limits
     gnt.set_ylim(0, y_lim)
     # Setting X-axis limits
-    gnt.set_xlim(0, x_lim)
+    gnt.set_xlim(start, x_lim)
 
 
 def set_figure_properties():
@@ -271,20 +372,9 @@ def display_overhead_label(cpu_time, gnt, overhead_label, show_overheads_labels,
 
         if text_x < x_lim:
             fontprops = FontProperties()
-            fontprops.set_size(10.2)
+            fontprops.set_size(LABEL_FONT_SIZE)
             fontprops.set_weight(800)
             fontprops.set_variant('small-caps')
 
             gnt.text(text_x, text_y, overhead_label, rotation='vertical', va='center', ha='center', alpha=1,
                      fontproperties=fontprops, zorder=12)
-
-
-def get_color(task_entry):
-    if task_entry[2] not in [ExecutionType.TASK, ExecutionType.MISSED_DEADLINE]:
-        return 'black'
-    elif task_entry[0] == IDLE_TASK:
-        return 'dimgray'
-    else:
-        task_id = task_entry[0]
-        n = task_id * PHI - floor(task_id * PHI)
-        return n, 0.5, 0.25
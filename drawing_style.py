@@ -0,0 +1,38 @@
+from math import floor, log10
+
+from task import IDLE_TASK
+from utils import ExecutionType, PHI
+
+# Overheads whose label is written on the schedule
+LABELED_OVERHEADS = [ExecutionType.TICK_OVERHEAD, ExecutionType.PREEMPTION_OVERHEAD, ExecutionType.END_JOB_OVERHEAD]
+# Above this number of time units, the x axis is not graduated on every time unit anymore
+MAX_GRADUATED_INTERVAL = 100
+# Approximate number of labelled graduations on a long x axis
+X_LABELS_AMOUNT = 10
+
+
+def get_color(task_id, exec_type):
+    if exec_type not in [ExecutionType.TASK, ExecutionType.MISSED_DEADLINE]:
+        return 'black'
+    elif task_id == IDLE_TASK:
+        return 'dimgray'
+    else:
+        n = task_id * PHI - floor(task_id * PHI)
+        return n, 0.5, 0.25
+
+
+def get_first_instant(start, first, period):
+    """
+    :return: the first instant first + k * period, with k >= 0, which is not before start
+    """
+    return first + max(0, -(-(start - first) // period)) * period
+
+
+def get_round_step(minimum_step):
+    """
+    :return: the smallest step of the form 1, 2 or 5 times a power of 10 which is not below the given step
+    """
+    power = 10 ** floor(log10(minimum_step))
+    for factor in (1, 2, 5, 10):
+        if factor * power >= minimum_step:
+            return factor * power
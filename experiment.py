@@ -0,0 +1,190 @@
+import argparse
+import csv
+import os
+import random
+import sys
+from multiprocessing import Pool
+
+from simulation_config import OVERHEAD_KEYS, SimulationConfig
+from sweep import get_points, parse_grid, parse_values
+from task_set_generator import UTILIZATION_METHODS, generate_task_set
+from utils import Schedulability, SchedulerType
+
+# Columns of the result table after the overheads
+RESULT_KEYS = ['utilization', 'sets', 'schedulable', 'ratio']
+
+# Settings of a worker process, set once by init_worker
+worker_settings = None
+
+
+class SchedulabilityRatios:
+    """
+    Counts of the schedulable task sets per configuration and utilization, updated as the results arrive.
+    """
+
+    def __init__(self, configurations):
+        self.configurations = configurations
+        self.sets = {}
+        self.schedulable = {}
+
+    def add(self, utilization, verdicts):
+        self.sets[utilization] = self.sets.get(utilization, 0) + 1
+        counts = self.schedulable.setdefault(utilization, [0] * len(self.configurations))
+        for index, schedulable in enumerate(verdicts):
+            counts[index] += schedulable
+
+    def get_ratios(self, utilization):
+        """
+        :return: the share of the task sets of the utilization schedulable with every configuration
+        """
+        return [count / self.sets[utilization] for count in self.schedulable[utilization]]
+
+    def get_rows(self):
+        """
+        :return: the rows of the result table, by configuration then by utilization
+        """
+        rows = []
+        for index, configuration in enumerate(self.configurations):
+            for utilization in sorted(self.sets):
+                schedulable = self.schedulable[utilization][index]
+                rows.append({**configuration.get_overheads(), 'utilization': utilization,
+                             'sets': self.sets[utilization], 'schedulable': schedulable,
+                             'ratio': schedulable / self.sets[utilization]})
+        return rows
+
+
+def get_task_set_seed(seed, utilization, index):
+    """
+    The task sets are seeded individually, so they do not depend on the number of workers nor on the order in which
+    they are generated, and the same task sets are used for every configuration.
+
+    :return: the seed of the random generator of a task set
+    """
+    return f"{seed}:{utilization!r}:{index}"
+
+
+def run_experiment(utilizations, sets_amount, configurations, generator_options, seed=0, workers=None,
+                   use_analysis=False, event_driven=False):
+    """
+    Generates sets_amount task sets per utilization with generate_task_set, called with generator_options, and
+    checks every task set with every SimulationConfig on a pool of worker processes. With use_analysis, the
+    simulation is only run when the analytical tests are inconclusive.
+
+    :return: a generator of (utilization, schedulable with every configuration), in order of completion
+    """
+    jobs = [(utilization, index) for utilization in utilizations for index in range(sets_amount)]
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    chunk_size = max(1, len(jobs) // (16 * workers))
+
+    with Pool(workers, initializer=init_worker,
+              initargs=(configurations, generator_options, seed, use_analysis, event_driven)) as pool:
+        yield from pool.imap_unordered(evaluate_task_set, jobs, chunk_size)
+
+
+def init_worker(configurations, generator_options, seed, use_analysis, event_driven):
+    global worker_settings
+    worker_settings = (configurations, generator_options, seed, use_analysis, event_driven)
+
+
+def evaluate_task_set(job):
+    """
+    Generates one task set and checks it with every configuration in a worker process.
+
+    :return: the utilization of the task set and the list of the verdicts of the configurations
+    """
+    from analysis import check_schedulability
+    from result_cache import simulate
+
+    utilization, index = job
+    configurations, generator_options, seed, use_analysis, event_driven = worker_settings
+    rng = random.Random(get_task_set_seed(seed, utilization, index))
+    task_set = generate_task_set(rng, utilization=utilization, **generator_options)
+
+    verdicts = []
+    for configuration in configurations:
+        if use_analysis:
+            verdict = check_schedulability(task_set, configuration.algorithm, configuration.get_overheads())
+            if verdict != Schedulability.INCONCLUSIVE:
+                verdicts.append(verdict == Schedulability.SCHEDULABLE)
+                continue
+        (missed_deadline, _), _ = simulate(task_set, configuration, event_driven=event_driven)
+        verdicts.append(not missed_deadline)
+    return utilization, verdicts
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Measures the share of random task sets meeting all their deadlines "
+                                                 "per utilization, for a grid of overheads")
+    parser.add_argument("-utilizations",
+                        required=True,
+                        help="Utilizations of the task sets, a list such as 0.5,0.75 or an inclusive range "
+                             "START:STOP:STEP such as 0.5:1:0.05")
+    parser.add_argument("-sets", type=int, default=100, help="Number of task sets per utilization")
+    parser.add_argument("-tasks", type=int, default=5, help="Number of tasks per task set")
+    parser.add_argument("-periods",
+                        nargs=2,
+                        type=int,
+                        default=[10, 1000],
+                        metavar=('MIN', 'MAX'),
+                        help="Range of the periods, drawn log-uniformly")
+    parser.add_argument("-hyperperiod",
+                        type=int,
+                        help="Maximum hyperperiod, the periods being rounded to its divisors, e.g. 3600")
+    parser.add_argument("-method",
+                        choices=UTILIZATION_METHODS,
+                        default='uunifast',
+                        help="Algorithm drawing the utilizations of the tasks")
+    parser.add_argument("-granularity", type=float, default=0.01, help="The WCETs are rounded to a multiple of it")
+    parser.add_argument("-algorithm",
+                        choices=[scheduler.name for scheduler in SchedulerType],
+                        default=SchedulerType.RM.name,
+                        help="Scheduling algorithm")
+    parser.add_argument("-vary",
+                        action='append',
+                        default=[],
+                        metavar='KEY=VALUES',
+                        help="Values of an overhead, every combination giving a curve, as for sweep.py. The tick "
+                             "rate is 1 and the other overheads are null unless given. Can be repeated")
+    parser.add_argument("-seed", default='0', help="Seed of the experiment, the same seed giving the same task sets")
+    parser.add_argument("-output", help="Filename of the CSV result table, the standard output by default")
+    parser.add_argument("-workers",
+                        metavar='N',
+                        type=int,
+                        help="Number of worker processes, all the cores by default")
+    parser.add_argument("-analysis",
+                        help="Run the analytical schedulability tests first and only simulate if they are inconclusive",
+                        action="store_true")
+    parser.add_argument("-events",
+                        help="Use the event-driven engine which skips the ticks where nothing can happen",
+                        action="store_true")
+    args = parser.parse_args()
+
+    try:
+        utilizations = parse_values(args.utilizations)
+        grid = parse_grid(args.vary)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.sets <= 0 or args.tasks <= 0 or not 0 < args.periods[0] <= args.periods[1]:
+        parser.error("-sets, -tasks and -periods expect positive values")
+
+    base_overheads = {key: 1 if key == 'Tick_rate' else 0 for key in OVERHEAD_KEYS}
+    algorithm = SchedulerType[args.algorithm]
+    configurations = [SimulationConfig.from_overheads(point, algorithm) for point in get_points(base_overheads, grid)]
+    generator_options = dict(tasks_amount=args.tasks, min_period=args.periods[0], max_period=args.periods[1],
+                             max_hyperperiod=args.hyperperiod, method=args.method, wcet_granularity=args.granularity)
+
+    ratios = SchedulabilityRatios(configurations)
+    for utilization, verdicts in run_experiment(utilizations, args.sets, configurations, generator_options, args.seed,
+                                                args.workers, args.analysis, args.events):
+        ratios.add(utilization, verdicts)
+        # The ratios of a utilization are shown as soon as all its task sets are checked
+        if ratios.sets[utilization] == args.sets:
+            print(f"Utilization {utilization}:", " ".join(f"{ratio:.3f}" for ratio in ratios.get_ratios(utilization)),
+                  file=sys.stderr)
+
+    f = open(args.output, 'w', newline='') if args.output else sys.stdout
+    writer = csv.DictWriter(f, OVERHEAD_KEYS + RESULT_KEYS)
+    writer.writeheader()
+    writer.writerows(ratios.get_rows())
+    if args.output:
+        f.close()
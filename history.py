@@ -0,0 +1,119 @@
+from array import array
+from bisect import bisect_right
+
+from utils import ExecutionType
+
+NO_LABEL = ""
+
+
+class History:
+    """
+    Columnar record of the schedule. Each entry is spread over typed arrays holding its absolute start time, its
+    duration, the name of the task, the code of its ExecutionType and the code of its label. The labels are stored
+    once in a table, the label of a missed deadline entry being the deadline itself.
+
+    The start time of an entry is the sum of the positive durations recorded before it, which is also how the
+    schedule is drawn, so the start times are sorted and can be searched by time.
+    """
+
+    def __init__(self, recording=True):
+        self.recording = recording
+        self.starts = array('d')
+        self.durations = array('d')
+        self.task_ids = array('i')
+        self.execution_types = array('b')
+        self.label_codes = array('h')
+        self.labels = [NO_LABEL]
+        self.label_table = {NO_LABEL: 0}
+        self.clock = 0.0
+
+    def record(self, task_id, duration, execution_type, label=NO_LABEL):
+        if not self.recording:
+            return
+
+        label_code = self.label_table.get(label)
+        if label_code is None:
+            label_code = len(self.labels)
+            self.labels.append(label)
+            self.label_table[label] = label_code
+
+        self.starts.append(self.clock)
+        self.durations.append(duration)
+        self.task_ids.append(task_id)
+        self.execution_types.append(execution_type.value)
+        self.label_codes.append(label_code)
+        if duration > 0:
+            self.clock += duration
+
+    def record_missed_deadline(self, task_id, deadline):
+        self.record(task_id, 2, ExecutionType.MISSED_DEADLINE, deadline)
+
+    def repeat(self, mark, count):
+        """
+        Appends the entries recorded since the given mark again, count times, shifting their start times.
+        """
+        if not self.recording or count <= 0:
+            return
+
+        pattern_starts = self.starts[mark:]
+        span = self.clock - pattern_starts[0] if pattern_starts else 0.0
+        self.starts.extend(start + k * span for k in range(1, count + 1) for start in pattern_starts)
+        self.durations.extend(self.durations[mark:] * count)
+        self.task_ids.extend(self.task_ids[mark:] * count)
+        self.execution_types.extend(self.execution_types[mark:] * count)
+        self.label_codes.extend(self.label_codes[mark:] * count)
+        self.clock += count * span
+
+    def get_size(self):
+        return len(self.starts)
+
+    def get_entry(self, index):
+        """
+        Rebuilds an entry with the tuple layout used by the rest of the simulator.
+
+        :return: (task_id, duration, execution_type) or (task_id, duration, execution_type, label)
+        """
+        entry = (self.task_ids[index], self.durations[index], ExecutionType(self.execution_types[index]))
+        label = self.labels[self.label_codes[index]]
+        if label == NO_LABEL:
+            return entry
+        return entry + (label,)
+
+    def get_label(self, index):
+        return self.labels[self.label_codes[index]]
+
+    def get_index_range(self, start_time, end_time):
+        """
+        Finds the entries overlapping the time window [start_time, end_time] with a binary search on the start times.
+
+        :return: the first and the last + 1 indexes of the entries in the window
+        """
+        first = bisect_right(self.starts, start_time)
+        # The entry starting before the window may still run inside it
+        if first > 0:
+            first -= 1
+        last = bisect_right(self.starts, end_time)
+        return first, last
+
+    def to_numpy(self):
+        """
+        Exposes the columns as NumPy arrays sharing the memory of the history. The history cannot grow anymore while
+        these arrays are alive.
+
+        :return: a dictionary of NumPy arrays indexed by column name
+        """
+        import numpy as np
+
+        return {
+            'start': np.frombuffer(self.starts, dtype=np.float64),
+            'duration': np.frombuffer(self.durations, dtype=np.float64),
+            'task': np.frombuffer(self.task_ids, dtype=np.intc),
+            'type': np.frombuffer(self.execution_types, dtype=np.int8),
+            'label': np.frombuffer(self.label_codes, dtype=np.int16),
+        }
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __iter__(self):
+        return (self.get_entry(index) for index in range(len(self.starts)))
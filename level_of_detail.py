@@ -0,0 +1,81 @@
+import numpy as np
+
+from utils import ExecutionType
+
+
+class ScheduleBins:
+    """
+    Schedule aggregated over regular time bins, typically one bin per pixel of the drawing. For each task and each
+    execution type, it holds the fraction of every bin spent executing it.
+    """
+
+    def __init__(self, start, end, bins_amount):
+        self.start = start
+        self.end = end
+        self.edges = np.linspace(start, end, bins_amount + 1)
+        self.fractions = {}
+        self.missed_deadlines = []
+
+    def get_fraction(self, task_id, execution_types):
+        """
+        :return: the fraction of every bin spent by the task in any of the given execution types
+        """
+        fraction = np.zeros(len(self.edges) - 1)
+        for execution_type in execution_types:
+            if (task_id, execution_type) in self.fractions:
+                fraction += self.fractions[(task_id, execution_type)]
+        return np.minimum(fraction, 1)
+
+
+def bin_history(history, start, end, bins_amount):
+    """
+    Aggregates the entries of the history overlapping [start, end]. The cost only depends on the number of entries
+    through sorting and searching, nothing is done per entry in Python.
+
+    :return: the ScheduleBins of the window
+    """
+    bins = ScheduleBins(start, end, bins_amount)
+    starts = np.asarray(history.starts, dtype=np.float64)
+    durations = np.asarray(history.durations, dtype=np.float64)
+    task_ids = np.asarray(history.task_ids)
+    execution_types = np.asarray(history.execution_types)
+
+    # The missed deadlines are markers, their duration is not spent by the processor
+    missed = execution_types == ExecutionType.MISSED_DEADLINE.value
+    for index in np.flatnonzero(missed):
+        bins.missed_deadlines.append((int(task_ids[index]), float(history.get_label(index))))
+
+    used = (durations > 0) & ~missed
+    if not used.any():
+        return bins
+
+    categories, category_of_entry = np.unique(np.stack([task_ids[used], execution_types[used]], axis=1), axis=0,
+                                              return_inverse=True)
+    category_of_entry = category_of_entry.reshape(-1)
+    starts = starts[used]
+    ends = starts + durations[used]
+    bin_width = (end - start) / bins_amount
+
+    for category, (task_id, execution_type) in enumerate(categories):
+        in_category = category_of_entry == category
+        busy_time = get_busy_time(starts[in_category], ends[in_category], bins.edges)
+        bins.fractions[(int(task_id), ExecutionType(execution_type))] = busy_time / bin_width
+
+    return bins
+
+
+def get_busy_time(starts, ends, edges):
+    """
+    The busy time before an instant t is the sum over the entries of clip(t - start, 0, duration), i.e. the sum of
+    t - start over the entries started before t minus the sum of t - end over the entries ended before t. Both sums
+    are obtained for all the edges at once from the sorted bounds and their prefix sums.
+
+    :return: the busy time inside every bin
+    """
+    def get_time_since(bounds):
+        bounds = np.sort(bounds)
+        prefix_sums = np.concatenate(([0.0], np.cumsum(bounds)))
+        counts = np.searchsorted(bounds, edges, side='right')
+        return counts * edges - prefix_sums[counts]
+
+    return np.diff(get_time_since(starts) - get_time_since(ends))
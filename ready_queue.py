@@ -0,0 +1,103 @@
+import heapq
+import math
+
+from utils import SchedulerType
+
+
+def rm_key(job):
+    """
+    Rate monotonic priority: the shortest period first, then the highest task name, then the earliest deadline.
+
+    :return: the sort key of the job
+    """
+    return job.period, -job.name, job.absolute_deadline
+
+
+def edf_key(job):
+    """
+    Earliest deadline first priority. The idle job has no deadline and always comes last.
+
+    :return: the sort key of the job
+    """
+    if math.isnan(job.absolute_deadline):
+        return math.inf
+    return job.absolute_deadline
+
+
+KEY_FUNCTIONS = {
+    SchedulerType.RM: rm_key,
+    SchedulerType.EDF: edf_key,
+}
+
+
+class ReadyQueue:
+    """
+    Single-threaded ready queue built on a binary heap. The sort key of a job is computed once when it is inserted,
+    so the heap never compares jobs themselves. Jobs with the same key are served in insertion order.
+
+    A second heap indexes the waiting jobs by latest start time. A job does not execute while it waits in the queue,
+    so its latest start time is fixed from its insertion until it leaves the queue. The entries of the jobs that
+    left the queue are discarded lazily.
+    """
+
+    def __init__(self, key=rm_key):
+        self.key = key
+        self.heap = []
+        self.latest_start_times = []
+        self.removed_entries = set()
+        self.entries_amount = 0
+
+    def put(self, job):
+        entry_id = self.entries_amount
+        self.entries_amount += 1
+        heapq.heappush(self.heap, (self.key(job), entry_id, job))
+
+        latest_start_time = job.get_latest_start_time()
+        # The idle job has no deadline
+        if not math.isnan(latest_start_time):
+            heapq.heappush(self.latest_start_times, (latest_start_time, entry_id, job))
+
+    def get(self):
+        _, entry_id, job = heapq.heappop(self.heap)
+        self.removed_entries.add(entry_id)
+        return job
+
+    def peek(self):
+        return self.heap[0][2]
+
+    def has_priority_over(self, job):
+        """
+        Checks if the head of the ready queue has a strictly higher priority than the given job.
+
+        :return: True if the head of the queue should preempt the given job
+        """
+        return self.heap[0][0] < self.key(job)
+
+    def peek_most_urgent(self):
+        """
+        Finds the waiting job with the earliest latest start time, i.e. the first one that would miss its deadline.
+
+        :return: the most urgent waiting job or None if only the idle job is waiting
+        """
+        while self.latest_start_times and self.latest_start_times[0][1] in self.removed_entries:
+            self.removed_entries.remove(heapq.heappop(self.latest_start_times)[1])
+
+        if self.latest_start_times:
+            return self.latest_start_times[0][2]
+        return None
+
+    def jobs(self):
+        return [entry[2] for entry in self.heap]
+
+    def get_ordered_jobs(self):
+        """
+        :return: the waiting jobs in the order in which they would be dispatched
+        """
+        return [entry[2] for entry in sorted(self.heap)]
+
+    def __len__(self):
+        return len(self.heap)
+
+
+def get_key_function(algorithm):
+    return KEY_FUNCTIONS[algorithm]
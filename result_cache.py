@@ -0,0 +1,170 @@
+import os
+import pickle
+import tempfile
+from collections import OrderedDict
+from hashlib import blake2b
+
+from simulation_config import OVERHEAD_KEYS
+from time_base import get_task_values, to_fraction
+
+# Changed whenever the results of the simulator change, so that older cached results are not used
+CACHE_VERSION = 3
+DEFAULT_MAX_ENTRIES = 4096
+DEFAULT_MAX_DISK_SIZE = 64 * 1024 * 1024
+# Modes of the simulator whose results are cached, with the method giving the result
+MODES = {'interval': 'run', 'cycle': 'find_cycle', 'bound': 'find_bounded_interval'}
+
+
+def get_task_parameters(task_set):
+    """
+    The tasks are kept in the order of the input file, which the results depend on even under RM: the position of a
+    task in the timer list decides where the decrement timer overhead is charged, and the order of the ready queue
+    which late job is reported first.
+
+    :return: the name and the parameters of the tasks as exact fractions, in the order of the task set
+    """
+    return [(task.name,) + tuple(str(to_fraction(value)) for value in get_task_values(task))
+            for task in task_set.get_tasks()]
+
+
+def get_cache_key(task_set, config, mode, *arguments):
+    """
+    :return: a digest of everything the result of a simulation depends on
+    """
+    overheads = config.get_overheads()
+    canonical = (CACHE_VERSION, mode, arguments, config.algorithm.name, config.consider_tick_overheads,
+                 [str(to_fraction(overheads[key])) for key in OVERHEAD_KEYS],
+                 get_task_parameters(task_set))
+    return blake2b(repr(canonical).encode(), digest_size=16).hexdigest()
+
+
+class ResultCache:
+    """
+    Cache of simulation results with two tiers: the most recently used results in memory and, when a directory is
+    given, one file per result on disk, shared by the processes using the same directory. The least recently used
+    files are removed once the directory is larger than max_disk_size bytes.
+    """
+
+    def __init__(self, directory=None, max_entries=DEFAULT_MAX_ENTRIES, max_disk_size=DEFAULT_MAX_DISK_SIZE):
+        self.memory = OrderedDict()
+        self.max_entries = max_entries
+        self.directory = directory
+        self.max_disk_size = max_disk_size
+        self.hits = self.misses = 0
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+            # The size of the directory is only counted again when the estimate goes above the limit
+            self.disk_size = self.__get_disk_size()
+
+    def get(self, key):
+        """
+        :return: the cached result, None if there is none
+        """
+        if key in self.memory:
+            self.memory.move_to_end(key)
+            self.hits += 1
+            return self.memory[key]
+
+        result = self.__read_file(key)
+        if result is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.__remember(key, result)
+        return result
+
+    def put(self, key, result):
+        self.__remember(key, result)
+        if self.directory is not None:
+            self.__write_file(key, result)
+
+    def __remember(self, key, result):
+        self.memory[key] = result
+        self.memory.move_to_end(key)
+        if len(self.memory) > self.max_entries:
+            self.memory.popitem(last=False)
+
+    def __read_file(self, key):
+        if self.directory is None:
+            return None
+        filename = os.path.join(self.directory, key)
+        try:
+            with open(filename, 'rb') as f:
+                result = pickle.load(f)
+            # The modification time orders the files by last use
+            os.utime(filename)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            return None
+        return result
+
+    def __write_file(self, key, result):
+        # Another process reading the file only sees complete results
+        with tempfile.NamedTemporaryFile('wb', dir=self.directory, suffix='.tmp', delete=False) as f:
+            pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+        self.disk_size += os.path.getsize(f.name)
+        os.replace(f.name, os.path.join(self.directory, key))
+
+        if self.disk_size > self.max_disk_size:
+            self.__evict()
+
+    def __get_disk_size(self):
+        return sum(entry.stat().st_size for entry in os.scandir(self.directory) if entry.is_file())
+
+    def __evict(self):
+        """
+        Removes the least recently used files until the directory uses at most three quarters of its maximum size,
+        so that the directory is not scanned on every write.
+        """
+        entries = []
+        for entry in os.scandir(self.directory):
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+        entries.sort()
+
+        self.disk_size = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if self.disk_size <= self.max_disk_size * 3 // 4:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            self.disk_size -= size
+
+
+# Cache used when none is given, in memory only unless configure_cache is called
+default_cache = ResultCache()
+
+
+def configure_cache(directory=None, max_entries=DEFAULT_MAX_ENTRIES, max_disk_size=DEFAULT_MAX_DISK_SIZE):
+    """
+    Replaces the default cache, e.g. to keep the results on disk between runs.
+    """
+    global default_cache
+    default_cache = ResultCache(directory, max_entries, max_disk_size)
+
+
+def get_default_cache():
+    return default_cache
+
+
+def simulate(task_set, config, mode='interval', event_driven=False, cache=None):
+    """
+    Simulates a task set without history, or returns the result of the same simulation from the cache. Both engines
+    give the same results, so they share the cached results.
+
+    :return: the result of Simulator.run, find_cycle or find_bounded_interval for the modes interval, cycle and bound
+    """
+    from simulator import Simulator
+
+    cache = get_default_cache() if cache is None else cache
+    key = get_cache_key(task_set, config, mode)
+    result = cache.get(key)
+    if result is None:
+        simulator = Simulator(task_set, config, event_driven=event_driven, record_history=False)
+        result = getattr(simulator, MODES[mode])()
+        cache.put(key, result)
+    return result
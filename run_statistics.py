@@ -0,0 +1,145 @@
+from dataclasses import dataclass
+
+from task import IDLE_TASK
+from utils import ExecutionType
+
+# Number of bins of the response time histogram of a task between 0 and its deadline, an extra bin counting the
+# response times above the deadline
+HISTOGRAM_BINS = 16
+OVERHEAD_TYPES = [ExecutionType.END_JOB_OVERHEAD, ExecutionType.TICK_OVERHEAD, ExecutionType.PREEMPTION_OVERHEAD,
+                  ExecutionType.INIT_OVERHEAD]
+
+
+@dataclass(frozen=True)
+class TaskStatistics:
+    jobs: int
+    worst_response_time: float
+    average_response_time: float
+    preemptions: int
+    # Counts of the response times in HISTOGRAM_BINS bins of width bin_width from 0, then above the deadline
+    histogram: tuple
+    bin_width: float
+
+
+@dataclass(frozen=True)
+class StatisticsReport:
+    """
+    Summary of a run. The shares are relative to the processor time, the sum of the execution, overhead and idle times
+    as in the history. It exceeds the simulated time when the overheads of some ticks are longer than the tick.
+    """
+    processor_time: float
+    ticks: int
+    idle_ratio: float
+    overhead_shares: dict
+    tasks: dict
+
+    def to_dict(self):
+        """
+        :return: the report with JSON types, the execution types and the tasks being named by strings
+        """
+        return {
+            'processor_time': self.processor_time,
+            'ticks': self.ticks,
+            'idle_ratio': self.idle_ratio,
+            'overhead_shares': {execution_type.name: share for execution_type, share in self.overhead_shares.items()},
+            'tasks': {str(name): {'jobs': task.jobs, 'worst_response_time': task.worst_response_time,
+                                  'average_response_time': task.average_response_time,
+                                  'preemptions': task.preemptions, 'histogram': list(task.histogram),
+                                  'bin_width': task.bin_width}
+                      for name, task in self.tasks.items()},
+        }
+
+    def format(self):
+        """
+        :return: the report as a table of the tasks followed by the shares of the processor time
+        """
+        lines = [f"{'Task':>6} {'Jobs':>8} {'Worst response':>16} {'Average response':>18} {'Preemptions':>12}"]
+        for name, task in self.tasks.items():
+            lines.append(f"{name:>6} {task.jobs:>8} {task.worst_response_time:>16.6g} "
+                         f"{task.average_response_time:>18.6g} {task.preemptions:>12}")
+        shares = ", ".join(f"{execution_type.name} {share:.2%}" for execution_type, share in
+                           self.overhead_shares.items())
+        lines.append(f"Processor time {self.processor_time:g}, {self.ticks} ticks, idle {self.idle_ratio:.2%}, "
+                     f"{shares}")
+        return "\n".join(lines)
+
+
+class StatisticsCollector:
+    """
+    Streaming aggregates of a run, updated by the simulator as it goes, so that they do not need the history. The
+    memory used only depends on the number of tasks. The times are kept in the integer units of the engine and only
+    converted by get_report.
+    """
+
+    def __init__(self, tasks):
+        self.deadlines = {task.name: task.deadline for task in tasks}
+        self.jobs = dict.fromkeys(self.deadlines, 0)
+        self.worst_response_times = dict.fromkeys(self.deadlines, 0)
+        self.total_response_times = dict.fromkeys(self.deadlines, 0)
+        self.preemptions = dict.fromkeys(self.deadlines, 0)
+        self.histograms = {name: [0] * (HISTOGRAM_BINS + 1) for name in self.deadlines}
+        self.times = dict.fromkeys(ExecutionType, 0)
+        self.idle_time = 0
+        self.ticks = 0
+
+    def add_time(self, task_id, duration, execution_type):
+        # As in the history, the entries without a positive duration do not use the processor
+        if duration <= 0:
+            return
+        if task_id == IDLE_TASK:
+            self.idle_time += duration
+        else:
+            self.times[execution_type] += duration
+
+    def add_tick(self):
+        self.ticks += 1
+
+    def add_preemption(self, task_id):
+        self.preemptions[task_id] += 1
+
+    def add_completion(self, task_id, response_time):
+        self.jobs[task_id] += 1
+        self.total_response_times[task_id] += response_time
+        if response_time > self.worst_response_times[task_id]:
+            self.worst_response_times[task_id] = response_time
+
+        deadline = self.deadlines[task_id]
+        index = min(response_time * HISTOGRAM_BINS // deadline, HISTOGRAM_BINS - 1) \
+            if response_time <= deadline else HISTOGRAM_BINS
+        self.histograms[task_id][index] += 1
+
+    def get_mark(self):
+        """
+        :return: a copy of the counters that change on the ticks replayed in bulk by the event-driven engine
+        """
+        return self.times.copy(), self.idle_time, self.ticks
+
+    def repeat(self, mark, count):
+        """
+        Adds the changes of the counters since the given mark again, count times.
+        """
+        times, idle_time, ticks = mark
+        for execution_type, time in times.items():
+            self.times[execution_type] += count * (self.times[execution_type] - time)
+        self.idle_time += count * (self.idle_time - idle_time)
+        self.ticks += count * (self.ticks - ticks)
+
+    def get_report(self, time_base):
+        """
+        :return: a StatisticsReport of the run so far, in the time unit of the task set
+        """
+        total_time = sum(self.times.values()) + self.idle_time
+        tasks = {}
+        for name, deadline in self.deadlines.items():
+            jobs = self.jobs[name]
+            average = self.total_response_times[name] / jobs if jobs else 0
+            tasks[name] = TaskStatistics(jobs, time_base.to_time(self.worst_response_times[name]),
+                                         time_base.to_time(average), self.preemptions[name],
+                                         tuple(self.histograms[name]), time_base.to_time(deadline / HISTOGRAM_BINS))
+        return StatisticsReport(
+            processor_time=time_base.to_time(total_time),
+            ticks=self.ticks,
+            idle_ratio=self.idle_time / total_time if total_time else 0,
+            overhead_shares={execution_type: self.times[execution_type] / total_time if total_time else 0
+                             for execution_type in OVERHEAD_TYPES},
+            tasks=tasks)
@@ -0,0 +1,222 @@
+import argparse
+import json
+import os
+import signal
+import socketserver
+import sys
+import threading
+import time
+from functools import partial
+from multiprocessing import Pool
+
+from corpus import parse_scenario
+from utils import Schedulability
+
+MODES = ['interval', 'run', 'cycle']
+
+
+class RequestTimeout(Exception):
+    pass
+
+
+def init_worker(cache_directory=None):
+    # The simulator is imported once per worker, the requests then only pay for the simulation itself
+    import simulator  # noqa: F401
+
+    if cache_directory:
+        from result_cache import configure_cache
+        configure_cache(cache_directory)
+
+    # Interrupting the server stops it cleanly from the main process
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if hasattr(signal, 'setitimer'):
+        signal.signal(signal.SIGALRM, raise_timeout)
+
+
+def raise_timeout(signum, frame):
+    raise RequestTimeout()
+
+
+def handle_request(request, default_timeout=None):
+    """
+    Runs the simulation described by a request in a worker process. The request is a scenario of a JSONL corpus,
+    with the parameters of the tasks, the algorithm and the overheads, and a mode:
+     - "interval" searches the simulation interval,
+     - "run" simulates until the given "horizon",
+     - "cycle" searches the first repetition of the scheduler state.
+
+    The optional fields are "id", echoed in the response, "events" to use the event-driven engine, "analysis" to run
+    the analytical tests first, "stats" to add a summary of the run with the statistics of the tasks and "timeout" in
+    seconds. The results of the interval and cycle modes without stats come from the result cache when the same
+    scenario was already simulated.
+
+    :return: the response as a dictionary
+    """
+    response = {'id': request.get('id')}
+    timeout = request.get('timeout', default_timeout)
+    begin = time.perf_counter()
+    try:
+        try:
+            # The timeout interrupts the simulation itself, so the worker is free for the next request
+            if timeout and hasattr(signal, 'setitimer'):
+                signal.setitimer(signal.ITIMER_REAL, timeout)
+            fields = simulate(request)
+        finally:
+            # The timer is disarmed before anything else, so the alarm cannot interrupt the building of the response
+            if timeout and hasattr(signal, 'setitimer'):
+                signal.setitimer(signal.ITIMER_REAL, 0)
+        response.update(fields)
+        response['status'] = 'ok'
+    except RequestTimeout:
+        response['status'] = 'timeout'
+    except Exception as e:
+        response['status'] = 'error'
+        response['error'] = f"{type(e).__name__}: {e}"
+
+    if 'stats' in response:
+        response['stats']['elapsed'] = time.perf_counter() - begin
+    return response
+
+
+def simulate(request):
+    """
+    :return: the fields of the response specific to the mode
+    """
+    from result_cache import MODES as CACHED_MODES, simulate as simulate_cached
+    from simulation_config import SimulationConfig
+    from simulator import Simulator
+
+    mode = request.get('mode', 'interval')
+    if mode not in MODES:
+        raise Exception(f"Unknown mode {mode}, known are {MODES}")
+    horizon = request.get('horizon')
+    if mode == 'run' and (isinstance(horizon, bool) or not isinstance(horizon, (int, float)) or horizon < 0):
+        raise Exception("The run mode requires a \"horizon\", a non-negative number")
+    task_set, algorithm, overheads = parse_scenario(request)
+
+    if request.get('analysis'):
+        from analysis import check_schedulability
+        verdict = check_schedulability(task_set, algorithm, overheads)
+        if verdict != Schedulability.INCONCLUSIVE:
+            return {'analysis': verdict.name}
+
+    config = SimulationConfig.from_overheads(overheads, algorithm)
+    event_driven = bool(request.get('events'))
+    # The stats need the state of the simulator at the end of the run
+    if mode in CACHED_MODES and not request.get('stats'):
+        simulator = None
+        outcome = simulate_cached(task_set, config, mode, event_driven)
+    else:
+        simulator = Simulator(task_set, config, event_driven=event_driven, record_history=False,
+                              collect_statistics=bool(request.get('stats')))
+        outcome = None
+
+    if mode == 'interval':
+        missed_deadline, sim_interval = outcome or simulator.run()
+        result = {'interval': [0, sim_interval]}
+    elif mode == 'run':
+        missed_deadline = simulator.run(horizon)
+        result = {'horizon': horizon}
+    else:
+        missed_deadline, transient, cycle_length = outcome or simulator.find_cycle()
+        result = {'transient': transient, 'cycle_length': cycle_length}
+
+    result['missed_deadline'] = missed_deadline[1] if missed_deadline[0] else None
+    if request.get('stats'):
+        result['stats'] = {
+            'simulated_time': simulator.time_base.to_time(simulator.current_time),
+            'released_jobs': {str(timer.task.name): timer.job_counter for timer in simulator.timer_list},
+            **simulator.get_statistics().to_dict(),
+        }
+    return result
+
+
+def serve_stream(pool, lines, send, default_timeout=None):
+    """
+    Submits every request line to the pool as soon as it is read, and sends each response as soon as it is ready,
+    so the responses come in order of completion and are matched with the requests by their id. Returns when every
+    request has been answered.
+    """
+    lock = threading.Lock()
+
+    def respond(response):
+        message = json.dumps(response) + "\n"
+        with lock:
+            send(message)
+
+    def respond_error(request_id, error):
+        # Every request is answered, even when the worker fails outside of the handling of the simulation errors
+        respond({'id': request_id, 'status': 'error', 'error': f"{type(error).__name__}: {error}"})
+
+    pending = []
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            request = json.loads(line)
+        except json.JSONDecodeError as e:
+            respond({'id': None, 'status': 'error', 'error': f"Invalid JSON: {e}"})
+            continue
+        if not isinstance(request, dict):
+            respond({'id': None, 'status': 'error', 'error': "A request must be a JSON object"})
+            continue
+        pending.append(pool.apply_async(handle_request, (request, default_timeout), callback=respond,
+                                        error_callback=partial(respond_error, request.get('id'))))
+
+    for result in pending:
+        result.wait()
+
+
+def serve_stdin(pool, default_timeout=None):
+    def send(message):
+        sys.stdout.write(message)
+        sys.stdout.flush()
+
+    serve_stream(pool, sys.stdin, send, default_timeout)
+
+
+def serve_socket(pool, path, default_timeout=None):
+    """
+    Listens on a UNIX socket, every connection being a stream of requests served like the standard input.
+    """
+    class RequestHandler(socketserver.StreamRequestHandler):
+        def handle(self):
+            lines = (line.decode() for line in self.rfile)
+            serve_stream(pool, lines, lambda message: self.wfile.write(message.encode()), default_timeout)
+
+    if os.path.exists(path):
+        os.remove(path)
+    with socketserver.ThreadingUnixStreamServer(path, RequestHandler) as server:
+        server.daemon_threads = True
+        try:
+            server.serve_forever()
+        finally:
+            os.remove(path)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Serves simulation requests given as JSON lines")
+    parser.add_argument("-socket",
+                        metavar='PATH',
+                        help="Path of a UNIX socket to listen on instead of reading the standard input")
+    parser.add_argument("-workers",
+                        metavar='N',
+                        type=int,
+                        help="Number of worker processes, all the cores by default")
+    parser.add_argument("-timeout",
+                        metavar='SECONDS',
+                        type=float,
+                        help="Default maximum duration of a request")
+    parser.add_argument("-cache",
+                        metavar='DIR',
+                        help="Directory keeping the results of the simulations, shared by the workers and between runs")
+    args = parser.parse_args()
+
+    with Pool(args.workers, initializer=init_worker, initargs=(args.cache,)) as pool:
+        if args.socket:
+            try:
+                serve_socket(pool, args.socket, args.timeout)
+            except KeyboardInterrupt:
+                pass
+        else:
+            serve_stdin(pool, args.timeout)
@@ -0,0 +1,40 @@
+from dataclasses import dataclass
+
+from utils import SchedulerType
+
+OVERHEAD_KEYS = ['Tick_rate', 'Save', 'Load', 'Add_ready', 'Get_hpt', 'Decrement_timer', 'Restart_timer', 'Resume']
+
+
+@dataclass(frozen=True)
+class SimulationConfig:
+    """
+    Scheduling algorithm and overheads of a simulation, in the unit of the input file. A configuration is immutable,
+    so the same one can be shared by simulators running side by side.
+    """
+    algorithm: SchedulerType = SchedulerType.RM
+    tick_rate: float = 1
+    save: float = 0
+    load: float = 0
+    add_ready: float = 0
+    get_hpt: float = 0
+    decrement_timer: float = 0
+    restart_timer: float = 0
+    resume: float = 0
+    # Without overheads, the ticks do not record any overhead
+    consider_tick_overheads: bool = False
+
+    @staticmethod
+    def from_overheads(overheads, algorithm):
+        """
+        :return: the configuration of the overheads read from an input file, indexed by OVERHEAD_KEYS
+        """
+        return SimulationConfig(algorithm, overheads['Tick_rate'], overheads['Save'], overheads['Load'],
+                                overheads['Add_ready'], overheads['Get_hpt'], overheads['Decrement_timer'],
+                                overheads['Restart_timer'], overheads['Resume'], consider_tick_overheads=True)
+
+    def get_overheads(self):
+        """
+        :return: the overheads indexed by OVERHEAD_KEYS, the inverse of from_overheads
+        """
+        return dict(zip(OVERHEAD_KEYS, [self.tick_rate, self.save, self.load, self.add_ready, self.get_hpt,
+                                        self.decrement_timer, self.restart_timer, self.resume]))
@@ -1,54 +1,94 @@
-from queue import PriorityQueue
+import copy
+import os
+import pickle
+import sys
+import time
+from functools import partial
+from hashlib import blake2b
 
 from task import *
 
-import numpy as np
-from draw import draw_schedule
+from history import History, NO_LABEL
+from ready_queue import ReadyQueue, get_key_function
+from result_cache import configure_cache, get_cache_key, get_default_cache
+from run_statistics import StatisticsCollector
+from simulation_config import SimulationConfig
 from task_set import TaskSet
-from timer_control_block import TimerControlBlock
-from utils import ExecutionType, parse_input_file, parse_arguments
-
-TICK_RATE = 1
-SAVING_CONTEXT_OVERHEAD = 0.00
-LOADING_CONTEXT_OVERHEAD = 0.00
-DECREMENT_TIMER_OVERHEAD = 0.00
-RESTART_TIMER_OVERHEAD = 0.00
-RESUME_OVERHEAD = 0.00
-ADD_READY_OVERHEAD = 0.00
-GET_HPT_OVERHEAD = 0.00
-END_TASK_OVERHEAD = 0
-PREEMPTION_OVERHEAD = 0
-CONSIDER_TICK_OVERHEADS = False
+from time_base import TimeBase, get_task_values
+from timer_control_block import TimerControlBlock, TimerQueue
+from trace_file import TraceReader, TraceWriter
+from utils import Bound, ExecutionType, Schedulability, ceil_div, is_corpus, parse_input_file, parse_arguments
+
+CHECKPOINT_VERSION = 3
+# Wall time in seconds and batch of steps of the sample from which the duration of a simulation is estimated
+RUNTIME_SAMPLE_TIME = 0.2
+RUNTIME_SAMPLE_STEPS = 1000
+# Above this estimated duration in seconds, a warning is shown before simulating
+RUNTIME_WARNING = 10
 
 
 class Simulator:
-    def __init__(self, task_set: TaskSet):
+    def __init__(self, task_set: TaskSet, config: SimulationConfig = None, event_driven=False, record_history=True,
+                 history=None, collect_statistics=False):
         self.task_set = task_set
-        self.tasks = task_set.get_tasks()
+        self.config = config if config is not None else SimulationConfig()
+        self.event_driven = event_driven
+
+        # The engine runs on an integer time base, the values are converted back only when they are recorded or
+        # returned. The tasks are copied to the engine unit and their run-time state is kept in the timer control
+        # blocks, the given task set is left untouched and can be simulated again.
+        overheads = [self.config.tick_rate, self.config.save, self.config.load, self.config.decrement_timer,
+                     self.config.restart_timer, self.config.resume, self.config.add_ready, self.config.get_hpt]
+        task_values = [value for task in task_set.get_tasks() for value in get_task_values(task)]
+        self.time_base = TimeBase.from_values(overheads + task_values)
+        (self.tick_rate, self.save_overhead, self.load_overhead, self.decrement_timer_overhead,
+         self.restart_timer_overhead, self.resume_overhead, self.add_ready_overhead,
+         self.get_hpt_overhead) = [self.time_base.to_units(overhead) for overhead in overheads]
+        self.tasks = [self.time_base.scale_task(task) for task in task_set.get_tasks()]
+        self.consider_tick_overheads = self.config.consider_tick_overheads
+
         self.current_time = 0
-        self.ready_queue = PriorityQueue()
+        self.ready_queue = ReadyQueue(get_key_function(self.config.algorithm))
         self.timer_list = []
         self.current_job = None
-        self.history = []
-        self.time_before_tick = TICK_RATE
+        # The history can be replaced by any recorder with the same interface, such as a TraceWriter
+        self.history = history if history is not None else History(record_history)
+        # The statistics are updated during the run, so they do not need the history
+        self.statistics = StatisticsCollector(self.tasks) if collect_statistics else None
+        self.time_before_tick = self.tick_rate
         self.has_missed_deadline = False
         self.context_switch_flag = False
-        self.cumulative_overhead_time = 0.0
+        self.cumulative_overhead_time = 0
         self.tasks_state = {}
+        self.state_boundary = None
         self.last_interrupted_job = None
         self.deadline_miss_time = 0
 
-        for task in self.tasks:
-            self.timer_list.append(TimerControlBlock(task))
+        # State of the simulation interval search and of the cycle search, kept on the simulator so that a simulator
+        # restored from a checkpoint continues the search where it stopped
+        self.hyperperiods_amount = 0
+        self.previous_system_state = None
+        self.previous_system_state_time = 0
+        self.fingerprints = {}
+        self.last_boundary = 0
+
+        self.checkpoint_file = None
+        self.checkpoint_period = None
+        self.next_checkpoint_time = None
+
+        for index, task in enumerate(self.tasks):
+            timer = TimerControlBlock(task, index)
+            self.timer_list.append(timer)
             if task.offset == 0:
-                self.ready_queue.put(task.get_new_job(self.current_time))
+                self.ready_queue.put(timer.release_job())
+        self.timer_queue = TimerQueue(self.timer_list)
 
         idle_task = Task(IDLE_TASK, 0, math.inf, math.inf, math.inf, 0)
-        self.ready_queue.put(idle_task.get_new_job(self.current_time))
+        self.ready_queue.put(TimerControlBlock(idle_task).release_job())
 
     def dispatch(self):
-        if self.ready_queue.queue[0].name == IDLE_TASK:
-            self.current_job = self.ready_queue.queue[0]
+        if self.ready_queue.peek().name == IDLE_TASK:
+            self.current_job = self.ready_queue.peek()
         else:
             self.current_job = self.ready_queue.get()
 
@@ -56,21 +96,29 @@ class Simulator:
     # the time left from the WCET.
     def execute_job(self):
         self.last_interrupted_job = self.current_job
-        if self.current_job.task.remaining_init_time > 0:
+        if self.current_job.control_block.remaining_init_time > 0:
             self.__execute_job_til_tick(init_phase=True)
             if self.time_before_tick <= 0:
                 return
 
         self.__execute_job_til_tick(init_phase=False)
         if self.current_job.remaining_time <= 0:
+            if self.statistics is not None:
+                # The job is released at its nominal release time, the delay until the next tick is part of its
+                # response time
+                job = self.current_job
+                completion_time = self.current_time + self.tick_rate - self.time_before_tick
+                self.statistics.add_completion(job.name, completion_time - (job.absolute_deadline - job.deadline))
             if self.__is_ctx_flag_needed():
                 self.context_switch_flag = True
             self.__add_end_task_overhead()
             self.dispatch()
 
     def tick(self):
-        self.current_time += TICK_RATE
-        self.time_before_tick = TICK_RATE
+        self.current_time += self.tick_rate
+        self.time_before_tick = self.tick_rate
+        if self.statistics is not None:
+            self.statistics.add_tick()
 
         self.__save_tasks_state()
         self.__reset_ctx_flag()
@@ -80,24 +128,26 @@ class Simulator:
         if self.__is_preemption_required(some_task_awaken):
             # If the head of the ready queue has a higher priority than the current job
             # then, a preemption is required
+            if self.statistics is not None and self.current_job.name != IDLE_TASK:
+                self.statistics.add_preemption(self.current_job.name)
             self.__handle_preemption()
             self.__add_preemption_overhead()
         else:
             self.__add_get_hpt_overhead()
 
         if self.current_job.name != IDLE_TASK:
-            self.__add_tick_overhead(LOADING_CONTEXT_OVERHEAD, "LOAD")
+            self.__add_tick_overhead(self.load_overhead, "LOAD")
 
-        self.__add_tick_overhead(RESUME_OVERHEAD, "RESUME")
+        self.__add_tick_overhead(self.resume_overhead, "RESUME")
 
     def __add_get_hpt_overhead(self):
         # The overhead get_hpt is required when the currently interrupted job has already finished. The check is
         # required when the tick interrupted the end of jobs overheads.
         if self.__has_interrupted_job_finished():
-            self.history.append((TICK_TASK, GET_HPT_OVERHEAD, ExecutionType.PREEMPTION_OVERHEAD, "GET HPT"))
-            self.time_before_tick -= GET_HPT_OVERHEAD
-            self.cumulative_overhead_time += GET_HPT_OVERHEAD
-            self.__decrement_time_til_deadlines(GET_HPT_OVERHEAD)
+            self.__record(TICK_TASK, self.get_hpt_overhead, ExecutionType.PREEMPTION_OVERHEAD, "GET HPT")
+            self.time_before_tick -= self.get_hpt_overhead
+            self.cumulative_overhead_time += self.get_hpt_overhead
+            self.__check_deadlines()
 
         if self.current_job.name == IDLE_TASK:
             self.dispatch()
@@ -109,142 +159,471 @@ class Simulator:
         if total_time == -1:
             return self.__find_simulation_interval()
         else:
-            return self.__simulate_for(total_time)
+            return self.__simulate_for(self.time_base.to_units(total_time))
+
+    def fast_forward(self, start_time):
+        """
+        Simulates without recording the schedule until the last tick at or before the given time. The history then
+        continues from the current position of the engine, so the entries recorded afterwards keep their absolute
+        start times.
+
+        :return: True if a deadline was missed before the given time
+        """
+        self.__start()
+        last_tick = self.time_base.to_units(start_time) // self.tick_rate * self.tick_rate
+        history = self.history
+        self.history = History(recording=False)
+
+        # The execution before the next tick is part of the window when the next tick is the last one
+        while not self.has_missed_deadline and (self.current_time + self.tick_rate < last_tick or (
+                self.time_before_tick > 0 and self.current_time + self.tick_rate == last_tick)):
+            self.__step(last_tick)
+
+        self.history = history
+        self.history.clock = self.time_base.to_time(self.current_time + self.tick_rate - self.time_before_tick)
+        return self.has_missed_deadline
+
+    def find_cycle(self):
+        """
+        Simulates until the schedule provably repeats. A fingerprint of the complete state of the scheduler is kept
+        at every hyperperiod boundary, and the search stops as soon as a fingerprint is found again, whichever
+        earlier boundary it comes from.
+
+        :return: the deadline miss result, the length of the transient part before the cycle and the cycle length
+        """
+        self.__start()
+        h = self.time_base.to_units(self.task_set.hyperperiod)
+        transient = cycle_length = 0
+
+        while not self.has_missed_deadline:
+            if self.current_time > self.last_boundary and self.current_time % h == 0:
+                self.last_boundary = self.current_time
+                fingerprint = self.__get_state_fingerprint()
+                if fingerprint in self.fingerprints:
+                    transient = self.fingerprints[fingerprint]
+                    cycle_length = self.current_time - transient
+                    break
+                self.fingerprints[fingerprint] = self.current_time
+
+            self.__step((self.current_time // h + 1) * h)
+
+        return (self.has_missed_deadline, self.time_base.to_time(self.deadline_miss_time)), \
+            self.time_base.to_time(transient), self.time_base.to_time(cycle_length)
+
+    def find_bounded_interval(self):
+        """
+        Simulates until an idle instant, after the largest offset, at which the state of the scheduler is the same as
+        at an idle instant a cycle earlier, the cycle being the hyperperiod rounded to a whole number of ticks. The
+        schedule then repeats from that idle instant, which is much earlier than the end of the simulation interval
+        for task sets with a huge hyperperiod. The simulation interval search is used when the processor is not idle
+        for a whole cycle.
+
+        The end of the synchronous busy period is not a bound in this simulator: the jobs released at 0 are put in
+        the ready queue without the timer and ready queue overheads of the later releases, so the first busy period
+        is not the worst case.
+
+        :return: the deadline miss result, the instant at which the result is proven and the Bound proving it, None
+        when a deadline is missed
+        """
+        self.__start()
+        h = self.time_base.to_units(self.task_set.hyperperiod)
+        cycle = math.lcm(h, self.tick_rate)
+        max_offset = self.time_base.to_units(self.task_set.max_offset)
+        first_idle = first_fingerprint = None
+
+        while not self.has_missed_deadline:
+            # The idle instants are observed when the idle job starts, or resumes after a tick
+            if self.current_job.name == IDLE_TASK and self.time_before_tick > 0:
+                now = self.current_time + self.tick_rate - self.time_before_tick
+                if now >= max_offset and (first_idle is None or now >= first_idle + cycle):
+                    fingerprint = self.__get_state_fingerprint()
+                    if first_idle is not None and now == first_idle + cycle and fingerprint == first_fingerprint:
+                        return (False, 0.0), self.time_base.to_time(now), Bound.IDLE_INSTANT
+                    # The previous idle instant may belong to the transient part of the schedule, the comparison
+                    # starts again from this one
+                    first_idle, first_fingerprint = now, fingerprint
+
+            # Without an idle instant for a whole cycle, the processor may never be idle again
+            if self.current_time > (max_offset if first_idle is None else first_idle + cycle) + cycle:
+                missed_deadline, interval = self.__find_simulation_interval()
+                if missed_deadline[0]:
+                    break
+                return missed_deadline, interval, Bound.HYPERPERIOD
+
+            # No tick is skipped past the one preceding the idle instant to compare
+            if first_idle is None:
+                horizon = (self.current_time // h + 1) * h
+            else:
+                horizon = (first_idle + cycle) // self.tick_rate * self.tick_rate
+            self.__step(max(horizon, self.current_time + self.tick_rate))
+
+        miss_time = self.time_base.to_time(self.deadline_miss_time)
+        return (True, miss_time), miss_time, None
+
+    def estimate_bounded_runtime(self, sample_time=RUNTIME_SAMPLE_TIME):
+        """
+        Simulates a copy of the simulator for about sample_time seconds and extrapolates the speed of the simulation
+        to the instant find_bounded_interval is expected to reach: an idle instant a cycle after the largest offset
+        and the first idle instant. The simulator itself does not move, so find_bounded_interval still observes the
+        idle instants of the sample.
+
+        :return: the estimated number of seconds find_bounded_interval needs
+        """
+        probe = self.__copy()
+        probe.__start()
+        h = self.time_base.to_units(self.task_set.hyperperiod)
+        end = self.time_base.to_units(self.task_set.max_offset) + 2 * math.lcm(h, self.tick_rate)
+        start_time = probe.current_time
+        begin = time.perf_counter()
+
+        while not probe.has_missed_deadline and probe.current_time < end and \
+                time.perf_counter() - begin < sample_time:
+            # The clock is read once per batch of steps
+            for _ in range(RUNTIME_SAMPLE_STEPS):
+                if probe.has_missed_deadline or probe.current_time >= end:
+                    break
+                probe.__step(end)
+
+        elapsed = time.perf_counter() - begin
+        if probe.has_missed_deadline or probe.current_time >= end or probe.current_time == start_time:
+            return 0
+        return elapsed / (probe.current_time - start_time) * (end - start_time)
+
+    def __copy(self):
+        """
+        :return: an independent copy of the simulator, without history nor checkpoints
+        """
+        state = self.__dict__.copy()
+        del state['history']
+        probe = Simulator.__new__(Simulator)
+        probe.__dict__.update(copy.deepcopy(state))
+        probe.history = History(recording=False)
+        probe.checkpoint_file = None
+        return probe
+
+    def __get_state_fingerprint(self):
+        """
+        Builds a digest of everything the future of the schedule depends on. All times are taken relatively to the
+        current time, so that two states separated by a whole number of hyperperiods have the same fingerprint.
+
+        :return: a 128-bit digest of the state of the scheduler
+        """
+        def describe(job):
+            if job is None or job.name == IDLE_TASK:
+                return job and job.name
+            return job.name, job.remaining_time, job.absolute_deadline - self.current_time
+
+        state = (
+            self.time_before_tick,
+            self.context_switch_flag,
+            describe(self.current_job),
+            describe(self.last_interrupted_job),
+            self.last_interrupted_job is self.current_job,
+            [describe(job) for job in self.ready_queue.get_ordered_jobs()],
+            [(timer.release_time - self.current_time, timer.remaining_init_time)
+             for timer in self.timer_list],
+        )
+        return blake2b(repr(state).encode(), digest_size=16).digest()
 
     def get_history(self):
         return self.history
 
+    def get_statistics(self):
+        """
+        :return: the StatisticsReport of the run so far, None if the simulator does not collect statistics
+        """
+        if self.statistics is None:
+            return None
+        return self.statistics.get_report(self.time_base)
+
+    def get_overhead_share(self):
+        """
+        The overhead time is counted from the last hyperperiod boundary of the simulation interval search, from 0
+        otherwise. After the search, it covers the hyperperiods that repeat indefinitely.
+
+        :return: the share of the processor time spent in overheads since that instant
+        """
+        window = self.current_time - self.previous_system_state_time
+        return self.cumulative_overhead_time / window if window > 0 else 0
+
+    def set_checkpoint_file(self, filename, period=None):
+        """
+        Writes a checkpoint to the given file on the first tick at or after every multiple of the period, which is
+        the hyperperiod by default. Each checkpoint replaces the previous one.
+        """
+        self.checkpoint_file = filename
+        self.checkpoint_period = self.time_base.to_units(self.task_set.hyperperiod if period is None else period)
+        self.next_checkpoint_time = (self.current_time // self.checkpoint_period + 1) * self.checkpoint_period
+
+    def save_checkpoint(self, filename):
+        """
+        Saves a snapshot of the complete state of the simulator: tasks, timers, ready queue, current job, flags and
+        counters. The history is not part of the snapshot, only the time at which its next entry starts.
+        """
+        state = self.__dict__.copy()
+        del state['history']
+        checkpoint = {'version': CHECKPOINT_VERSION, 'state': state, 'history_clock': self.history.clock}
+
+        # The previous checkpoint is only replaced once the new one is completely written
+        temporary_filename = filename + '.tmp'
+        with open(temporary_filename, 'wb') as f:
+            pickle.dump(checkpoint, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary_filename, filename)
+
+    @staticmethod
+    def load_checkpoint(filename, record_history=True, history=None):
+        """
+        Restores a simulator from a checkpoint. Running it gives the same results and appends the same entries to
+        its history as the simulator that saved the checkpoint.
+
+        :return: the restored simulator
+        """
+        with open(filename, 'rb') as f:
+            checkpoint = pickle.load(f)
+        if checkpoint['version'] != CHECKPOINT_VERSION:
+            raise Exception(f"Unsupported checkpoint version {checkpoint['version']} in {filename}")
+
+        simulator = Simulator.__new__(Simulator)
+        simulator.__dict__.update(checkpoint['state'])
+        simulator.history = history if history is not None else History(record_history)
+        simulator.history.clock = checkpoint['history_clock']
+        return simulator
+
     def __is_preemption_required(self, some_task_awaken):
-        awaken_higher_priority = self.last_interrupted_job is not None and (
-                self.ready_queue.queue[0] < self.last_interrupted_job)
+        awaken_higher_priority = self.last_interrupted_job is not None and \
+            self.ready_queue.has_priority_over(self.last_interrupted_job)
         return some_task_awaken and awaken_higher_priority
 
     def __simulate_for(self, total_time):
-        self.dispatch()
+        self.__start()
 
         while self.current_time < total_time and not self.has_missed_deadline:
             # if self.last_interrupted_job is None and self.last_interrupted_job.remaining and self.time_before_tick == 0:
             #     self.last_interrupted_job = self.current_job
-            if self.time_before_tick > 0:
-                self.execute_job()
-            else:
-                self.tick()
+            self.__step(total_time)
 
-        return self.has_missed_deadline, self.deadline_miss_time
+        return self.has_missed_deadline, self.time_base.to_time(self.deadline_miss_time)
 
     def __find_simulation_interval(self):
-        self.dispatch()
-        k = 0
-        h = self.task_set.hyperperiod
-        previous_system_state = None
-        previous_system_state_time = 0
+        self.__start()
+        h = self.time_base.to_units(self.task_set.hyperperiod)
 
         while not self.has_missed_deadline:
+            k = self.hyperperiods_amount
             if self.current_time > 0 and self.current_time % (h + k * h) == 0:
                 current_system_state = (self.cumulative_overhead_time, self.tasks_state.copy())
-                if previous_system_state == current_system_state:
+                if self.previous_system_state == current_system_state:
                     break
-                previous_system_state = current_system_state
-                previous_system_state_time = self.current_time
-                self.cumulative_overhead_time = 0.0
-                k += 1
+                self.previous_system_state = current_system_state
+                self.previous_system_state_time = self.current_time
+                self.cumulative_overhead_time = 0
+                self.hyperperiods_amount += 1
 
-            if self.time_before_tick > 0:
-                self.execute_job()
-            else:
-                self.tick()
+            boundary = h + self.hyperperiods_amount * h
+            self.state_boundary = boundary
+            self.__step((self.current_time // boundary + 1) * boundary)
 
-        return (self.has_missed_deadline, self.deadline_miss_time), previous_system_state_time
+        return (self.has_missed_deadline, self.time_base.to_time(self.deadline_miss_time)), \
+            self.time_base.to_time(self.previous_system_state_time)
+
+    def __start(self):
+        # A simulator restored from a checkpoint or simulated again already has a current job
+        if self.current_job is None:
+            self.dispatch()
+
+    def __step(self, horizon):
+        # The horizon is the next time instant the calling loop needs to observe, no tick is skipped past it
+        if self.checkpoint_file is not None:
+            horizon = min(horizon, self.next_checkpoint_time)
+
+        if self.time_before_tick > 0:
+            self.execute_job()
+        elif self.event_driven and self.__is_tick_replicable(horizon):
+            self.__skip_quiet_ticks(horizon)
+        else:
+            self.tick()
+
+        if self.checkpoint_file is not None and self.current_time >= self.next_checkpoint_time:
+            self.save_checkpoint(self.checkpoint_file)
+            self.next_checkpoint_time = (self.current_time // self.checkpoint_period + 1) * self.checkpoint_period
+
+    def __is_tick_replicable(self, horizon):
+        """
+        Checks if the next tick is a quiet one, i.e. a tick that neither releases a job, nor follows the end of a
+        job, nor interrupts an initialization phase.
+
+        :return: True if the next tick can be used as a pattern for the following ones
+        """
+        return self.current_time + self.tick_rate < horizon \
+            and not self.context_switch_flag \
+            and self.last_interrupted_job is self.current_job \
+            and self.current_job.control_block.remaining_init_time <= 0 \
+            and self.timer_queue.get_next_release_time() > self.current_time + self.tick_rate
+
+    def __skip_quiet_ticks(self, horizon):
+        """
+        Executes the next tick normally and replays it in bulk as long as nothing can happen: no timer expires, the
+        current job does not complete and no deadline can be missed. The overheads of the skipped ticks are charged
+        analytically and the history receives the same entries as the per-tick engine would produce.
+        """
+        history_mark = self.history.get_size()
+        statistics_mark = self.statistics.get_mark() if self.statistics is not None else None
+        overhead_mark = self.cumulative_overhead_time
+        job = self.current_job
+
+        self.tick()
+        if self.has_missed_deadline:
+            return
+
+        if self.time_before_tick > 0:
+            executed_time = self.time_before_tick
+            self.execute_job()
+        else:
+            executed_time = 0
+
+        if self.has_missed_deadline or self.time_before_tick > 0 or self.current_job is not job \
+                or self.context_switch_flag:
+            return
+
+        overheads = self.cumulative_overhead_time - overhead_mark
+        skipped_ticks = self.__count_quiet_ticks(horizon, executed_time, overheads)
+        if skipped_ticks <= 0:
+            return
+
+        self.history.repeat(history_mark, skipped_ticks)
+        if self.statistics is not None:
+            self.statistics.repeat(statistics_mark, skipped_ticks)
+        self.current_time += skipped_ticks * self.tick_rate
+        self.cumulative_overhead_time += skipped_ticks * overheads
+        job.remaining_time -= skipped_ticks * executed_time
+        job.control_block.cumulative_cpu_time += skipped_ticks * executed_time
+
+    def __count_quiet_ticks(self, horizon, executed_time, overheads):
+        """
+        Counts how many ticks behave exactly like the one that has just been executed. The deadline bound keeps a
+        margin of one tick so that the tick on which a deadline is missed is always executed normally.
+
+        :return: the number of ticks that can be skipped
+        """
+        bounds = [ceil_div(horizon - self.current_time, self.tick_rate) - 1,
+                  ceil_div(self.timer_queue.get_next_release_time() - self.current_time, self.tick_rate) - 1]
+
+        job = self.current_job
+        if job.name != IDLE_TASK:
+            if executed_time > 0:
+                bounds.append(ceil_div(job.remaining_time, executed_time) - 1)
+            if overheads > 0:
+                bounds.append(self.__get_slack(job) // overheads - 1)
+            urgent_job = self.ready_queue.peek_most_urgent()
+            if urgent_job is not None:
+                bounds.append(self.__get_slack(urgent_job) // self.tick_rate - 1)
+
+        return min(bounds)
+
+    def __get_slack(self, job):
+        return job.absolute_deadline - self.current_time - (self.tick_rate - self.time_before_tick) - job.remaining_time
 
     def __execute_job_til_tick(self, init_phase):
-        updated_time_before_tick = 0.0
-        used_cpu_time = 0.0
+        updated_time_before_tick = 0
+        used_cpu_time = 0
 
         if init_phase:
-            updated_time_before_tick = max(0, self.time_before_tick - self.current_job.task.remaining_init_time)
-            used_cpu_time = min(self.time_before_tick, self.current_job.task.remaining_init_time)
+            control_block = self.current_job.control_block
+            updated_time_before_tick = max(0, self.time_before_tick - control_block.remaining_init_time)
+            used_cpu_time = min(self.time_before_tick, control_block.remaining_init_time)
             self.cumulative_overhead_time += used_cpu_time
-            self.current_job.task.remaining_init_time -= used_cpu_time
-            self.history.append((self.current_job.name, used_cpu_time, ExecutionType.INIT_OVERHEAD))
+            control_block.remaining_init_time -= used_cpu_time
+            self.__record(self.current_job.name, used_cpu_time, ExecutionType.INIT_OVERHEAD)
         else:
             updated_time_before_tick = max(0, self.time_before_tick - self.current_job.remaining_time)
             used_cpu_time = min(self.time_before_tick, self.current_job.remaining_time)
             self.current_job.remaining_time -= used_cpu_time
-            self.history.append((self.current_job.name, used_cpu_time, ExecutionType.TASK))
+            self.__record(self.current_job.name, used_cpu_time, ExecutionType.TASK)
 
         self.time_before_tick = updated_time_before_tick
-        self.current_job.task.cumulative_cpu_time += used_cpu_time
-        self.__decrement_time_til_deadlines(used_cpu_time)
+        self.current_job.control_block.cumulative_cpu_time += used_cpu_time
+        self.__check_deadlines()
+
+    def __record(self, task_id, duration, execution_type, label=NO_LABEL):
+        self.history.record(task_id, self.time_base.to_time(duration), execution_type, label)
+        if self.statistics is not None:
+            self.statistics.add_time(task_id, duration, execution_type)
 
     def __add_end_task_overhead(self):
         timeleft = self.time_before_tick
         overheads = 0
 
         # Check if there is enough time to execute the whole context saving overhead
-        if SAVING_CONTEXT_OVERHEAD <= timeleft:
-            self.history.append(
-                (self.current_job.name, SAVING_CONTEXT_OVERHEAD, ExecutionType.END_JOB_OVERHEAD, "SAVE"))
-            timeleft -= SAVING_CONTEXT_OVERHEAD
-            overheads += SAVING_CONTEXT_OVERHEAD
+        if self.save_overhead <= timeleft:
+            self.__record(
+                self.current_job.name, self.save_overhead, ExecutionType.END_JOB_OVERHEAD, "SAVE")
+            timeleft -= self.save_overhead
+            overheads += self.save_overhead
 
             # Check if there is enough time to execute the whole get_hpt overhead
-            if GET_HPT_OVERHEAD <= timeleft:
-                self.history.append(
-                    (self.current_job.name, GET_HPT_OVERHEAD, ExecutionType.END_JOB_OVERHEAD, "GET_HPT"))
-                timeleft -= GET_HPT_OVERHEAD
-                overheads += GET_HPT_OVERHEAD
+            if self.get_hpt_overhead <= timeleft:
+                self.__record(
+                    self.current_job.name, self.get_hpt_overhead, ExecutionType.END_JOB_OVERHEAD, "GET_HPT")
+                timeleft -= self.get_hpt_overhead
+                overheads += self.get_hpt_overhead
 
-                if self.ready_queue.queue[0].name != IDLE_TASK:
+                if self.ready_queue.peek().name != IDLE_TASK:
                     # Check if there is enough time to execute the whole context loading overhead
-                    if LOADING_CONTEXT_OVERHEAD <= timeleft:
-                        self.history.append(
-                            (self.current_job.name, LOADING_CONTEXT_OVERHEAD, ExecutionType.END_JOB_OVERHEAD, "LOAD"))
-                        overheads += LOADING_CONTEXT_OVERHEAD
+                    if self.load_overhead <= timeleft:
+                        self.__record(
+                            self.current_job.name, self.load_overhead, ExecutionType.END_JOB_OVERHEAD, "LOAD")
+                        overheads += self.load_overhead
                     else:
-                        self.history.append((self.current_job.name, timeleft, ExecutionType.END_JOB_OVERHEAD, "LOAD"))
+                        self.__record(self.current_job.name, timeleft, ExecutionType.END_JOB_OVERHEAD, "LOAD")
                         overheads += timeleft
             else:
-                self.history.append((self.current_job.name, timeleft, ExecutionType.END_JOB_OVERHEAD, "GET_HPT"))
+                self.__record(self.current_job.name, timeleft, ExecutionType.END_JOB_OVERHEAD, "GET_HPT")
                 overheads += timeleft
         else:
-            self.history.append((self.current_job.name, timeleft, ExecutionType.END_JOB_OVERHEAD, "SAVE"))
+            self.__record(self.current_job.name, timeleft, ExecutionType.END_JOB_OVERHEAD, "SAVE")
             overheads += timeleft
 
         self.time_before_tick -= overheads
         self.cumulative_overhead_time += overheads
-        self.__decrement_time_til_deadlines(overheads)
+        self.__check_deadlines()
 
     def __add_tick_overhead(self, overheads, label=""):
-        if CONSIDER_TICK_OVERHEADS:
-            self.history.append((TICK_TASK, overheads, ExecutionType.TICK_OVERHEAD, label))
+        if self.consider_tick_overheads:
+            self.__record(TICK_TASK, overheads, ExecutionType.TICK_OVERHEAD, label)
             self.time_before_tick -= overheads
             self.cumulative_overhead_time += overheads
-            self.__decrement_time_til_deadlines(overheads)
+            self.__check_deadlines()
 
     def __add_preemption_overhead(self):
-        preemption_overheads = GET_HPT_OVERHEAD
+        preemption_overheads = self.get_hpt_overhead
         if not self.__has_interrupted_job_finished() and self.last_interrupted_job.name != IDLE_TASK:
-            self.history.append((TICK_TASK, ADD_READY_OVERHEAD, ExecutionType.PREEMPTION_OVERHEAD, "ADD READY"))
-            preemption_overheads += ADD_READY_OVERHEAD
-        self.history.append((TICK_TASK, GET_HPT_OVERHEAD, ExecutionType.PREEMPTION_OVERHEAD, "GET HPT"))
+            self.__record(TICK_TASK, self.add_ready_overhead, ExecutionType.PREEMPTION_OVERHEAD, "ADD READY")
+            preemption_overheads += self.add_ready_overhead
+        self.__record(TICK_TASK, self.get_hpt_overhead, ExecutionType.PREEMPTION_OVERHEAD, "GET HPT")
         self.time_before_tick -= preemption_overheads
         self.cumulative_overhead_time += preemption_overheads
-        self.__decrement_time_til_deadlines(preemption_overheads)
+        self.__check_deadlines()
 
     def __add_initialization_overhead(self):
         init_overhead = self.current_job.get_init_overhead()
-        self.history.append((self.current_job.name, init_overhead, ExecutionType.INIT_OVERHEAD))
+        self.__record(self.current_job.name, init_overhead, ExecutionType.INIT_OVERHEAD)
         self.time_before_tick -= init_overhead
         self.cumulative_overhead_time += init_overhead
-        self.__decrement_time_til_deadlines(init_overhead)
+        self.__check_deadlines()
 
     def __save_tasks_state(self):
-        for task in self.tasks:
-            self.tasks_state[task.name] = [task.time_since_last_quest, task.cumulative_cpu_time]
+        # The state of the tasks is only compared on the boundaries of the simulation interval search, saving it on
+        # the other ticks would make every tick linear in the number of tasks
+        if self.state_boundary is None or self.current_time % self.state_boundary != 0:
+            return
+
+        for timer in self.timer_list:
+            self.tasks_state[timer.get_task().name] = [timer.get_time_since_last_quest(self.current_time - self.tick_rate),
+                                                       timer.cumulative_cpu_time]
 
     def __is_ctx_flag_needed(self):
-        return SAVING_CONTEXT_OVERHEAD <= self.time_before_tick \
-            and GET_HPT_OVERHEAD + LOADING_CONTEXT_OVERHEAD > (self.time_before_tick - SAVING_CONTEXT_OVERHEAD)
+        return self.save_overhead <= self.time_before_tick \
+            and self.get_hpt_overhead + self.load_overhead > (self.time_before_tick - self.save_overhead)
 
     def __handle_preemption(self):
         if self.current_job.name != IDLE_TASK:
@@ -252,94 +631,187 @@ class Simulator:
         self.dispatch()
 
     def __decrement_timers(self):
-        some_task_awaken = False
-        timers_overheads_included = False
-        for timer in self.timer_list:
-            current_task_awaken = False
-            if timer.decrement(TICK_RATE):
-                self.ready_queue.put(timer.get_task().get_new_job(self.current_time))
-                some_task_awaken = True
-                current_task_awaken = True
+        expired_timers = self.timer_queue.expire(self.current_time)
 
-            if not timers_overheads_included:
-                self.__add_tick_overhead(DECREMENT_TIMER_OVERHEAD, "DECREMENT TIMER")
-                timers_overheads_included = True
+        # The decrement overhead is charged after the first timer of the list has been handled
+        if not expired_timers or expired_timers[0].index != 0:
+            self.__add_tick_overhead(self.decrement_timer_overhead, "DECREMENT TIMER")
 
-            if current_task_awaken:
-                self.__add_tick_overhead(RESTART_TIMER_OVERHEAD, "RESTART TIMER")
-                self.__add_tick_overhead(ADD_READY_OVERHEAD, "ADD READY")
+        for timer in expired_timers:
+            self.ready_queue.put(timer.release_job())
+            if timer.index == 0:
+                self.__add_tick_overhead(self.decrement_timer_overhead, "DECREMENT TIMER")
+            self.__add_tick_overhead(self.restart_timer_overhead, "RESTART TIMER")
+            self.__add_tick_overhead(self.add_ready_overhead, "ADD READY")
 
-        return some_task_awaken
+        return len(expired_timers) > 0
 
-    def __decrement_time_til_deadlines(self, duration):
+    def __check_deadlines(self):
         if not self.has_missed_deadline:
-            for job in self.ready_queue.queue + [self.current_job]:
-                job.decrement_time_til_deadline(duration)
-                if job.absolute_deadline - self.current_time - (TICK_RATE - self.time_before_tick) < job.remaining_time:
-                    # if job.remaining_time > 0 and job.time_til_deadline <= 0:
+            # Only the running job and the most urgent waiting job can be the first ones to become late
+            urgent_job = self.ready_queue.peek_most_urgent()
+            if not self.__is_late(self.current_job) and (urgent_job is None or not self.__is_late(urgent_job)):
+                return False
+
+            for job in self.ready_queue.jobs() + [self.current_job]:
+                if self.__is_late(job):
                     self.has_missed_deadline = True
                     self.deadline_miss_time = job.absolute_deadline
-                    self.history.append((job.name, 2, ExecutionType.MISSED_DEADLINE, job.absolute_deadline))
+                    self.history.record_missed_deadline(job.name, self.time_base.to_time(job.absolute_deadline))
                     return True
             return False
 
+    def __is_late(self, job):
+        return job.absolute_deadline - self.current_time - (self.tick_rate - self.time_before_tick) < job.remaining_time
+
     def __reset_ctx_flag(self):
         if not self.context_switch_flag and (
                 self.last_interrupted_job is not None and self.last_interrupted_job.name != IDLE_TASK):
-            self.__add_tick_overhead(SAVING_CONTEXT_OVERHEAD, "SAVE")
+            self.__add_tick_overhead(self.save_overhead, "SAVE")
         else:
             self.context_switch_flag = False
 
 
-def set_system_settings(s_overheads, s_algorithm):
-    global TICK_RATE
-    TICK_RATE = s_overheads['Tick_rate']
-    global SAVING_CONTEXT_OVERHEAD
-    SAVING_CONTEXT_OVERHEAD = s_overheads['Save']
-    global LOADING_CONTEXT_OVERHEAD
-    LOADING_CONTEXT_OVERHEAD = s_overheads['Load']
-    global DECREMENT_TIMER_OVERHEAD
-    DECREMENT_TIMER_OVERHEAD = s_overheads['Decrement_timer']
-    global RESTART_TIMER_OVERHEAD
-    RESTART_TIMER_OVERHEAD = s_overheads['Restart_timer']
-    global RESUME_OVERHEAD
-    RESUME_OVERHEAD = s_overheads['Resume']
-    global ADD_READY_OVERHEAD
-    ADD_READY_OVERHEAD = s_overheads['Add_ready']
-    global GET_HPT_OVERHEAD
-    GET_HPT_OVERHEAD = s_overheads['Get_hpt']
-    global END_TASK_OVERHEAD
-    END_TASK_OVERHEAD = SAVING_CONTEXT_OVERHEAD + GET_HPT_OVERHEAD + LOADING_CONTEXT_OVERHEAD
-    global PREEMPTION_OVERHEAD
-    PREEMPTION_OVERHEAD = ADD_READY_OVERHEAD + GET_HPT_OVERHEAD
-    global CONSIDER_TICK_OVERHEADS
-    CONSIDER_TICK_OVERHEADS = True
-
-    Job.Scheduler = s_algorithm
+def create_simulator(args, task_set, config, record_history=True, history=None):
+    if args.resume:
+        simulator = Simulator.load_checkpoint(args.resume, record_history=record_history, history=history)
+    else:
+        simulator = Simulator(task_set, config, event_driven=args.events, record_history=record_history,
+                              history=history, collect_statistics=args.stats)
+    if args.checkpoint:
+        simulator.set_checkpoint_file(args.checkpoint)
+    return simulator
+
+
+def get_result_message(args, task_set, algorithm, overheads):
+    """
+    Analyses or simulates a task set, as the command line does when it does not draw.
+
+    :return: the sentence describing the result
+    """
+    # The analysis is cheap compared to the simulation, which is only needed when the analysis is inconclusive
+    if args.analysis:
+        from analysis import check_schedulability
+        verdict = check_schedulability(task_set, algorithm, overheads)
+        if verdict == Schedulability.SCHEDULABLE:
+            return "The analysis proves that all the deadlines are met"
+        elif verdict == Schedulability.NOT_SCHEDULABLE:
+            return "The analysis proves that a deadline is missed"
+
+    config = SimulationConfig.from_overheads(overheads, algorithm)
+    mode = 'cycle' if args.cycle else 'bound' if args.bound else 'interval'
+    # The same task set is often simulated again, but the runs writing files must really happen
+    use_cache = not (args.trace or args.checkpoint or args.resume or args.stats)
+    key = get_cache_key(task_set, config, mode)
+    result = get_default_cache().get(key) if use_cache else None
+
+    if result is None:
+        trace = TraceWriter(args.trace) if args.trace else None
+        try:
+            simulator = create_simulator(args, task_set, config, record_history=False, history=trace)
+            if args.cycle:
+                result = simulator.find_cycle()
+            elif args.bound:
+                seconds = simulator.estimate_bounded_runtime()
+                if seconds > RUNTIME_WARNING:
+                    print(f"Warning: the simulation of this task set should take about {seconds:.0f} s",
+                          file=sys.stderr)
+                result = simulator.find_bounded_interval()
+            else:
+                result = simulator.run()
+        finally:
+            # The trace keeps what was recorded even when the simulation fails or is interrupted
+            if trace is not None:
+                trace.close()
+        if use_cache:
+            get_default_cache().put(key, result)
+
+    if args.cycle:
+        missed_deadline, transient, cycle_length = result
+    elif args.bound:
+        missed_deadline, proof_time, bound = result
+    else:
+        missed_deadline, sim_interval = result
+
+    if missed_deadline[0]:
+        message = f"A deadline was missed at time instant  {missed_deadline[1]}"
+    elif args.cycle:
+        message = f"The schedule repeats from time instant  {transient}  with a cycle of length  {cycle_length}"
+    elif args.bound and bound == Bound.IDLE_INSTANT:
+        message = f"All the deadlines are met, the schedule repeats from the idle instant  {proof_time}"
+    elif args.bound:
+        message = f"The simulation interval is [0,  {proof_time} ]"
+    else:
+        message = f"The simulation interval is [0,  {sim_interval} ]"
+
+    # A simulator resumed from a checkpoint only has statistics if the one that saved it had
+    statistics = simulator.get_statistics() if args.stats else None
+    if statistics is not None:
+        message += "\n" + statistics.format()
+    return message
 
 
 if __name__ == '__main__':
     args = parse_arguments()
-
-    task_set, algorithm, overheads = parse_input_file(args.input)
-    set_system_settings(overheads, algorithm)
-
-    if args.draw:
+    if args.cache:
+        configure_cache(args.cache)
+
+    if is_corpus(args.input):
+        from corpus import read_corpus
+        # The scenarios are read lazily, one result line being printed per scenario
+        for index, (task_set, algorithm, overheads) in enumerate(read_corpus(args.input)):
+            print(f"{index}:", get_result_message(args, task_set, algorithm, overheads))
+    elif args.draw:
+        task_set, algorithm, overheads = parse_input_file(args.input)
+        config = SimulationConfig.from_overheads(overheads, algorithm)
         output = args.draw[0]
-        interval = int(args.draw[1])
-
-        simulator = Simulator(task_set)
-        simulator.run(interval)
-
-        print("The schedule was saved to file ", output)
-        task_set.add_task(Task(IDLE_TASK, 0, math.inf, math.inf, 0, 0))
-        draw_schedule(simulator.get_history(), task_set, TICK_RATE, output, show_tick=args.ticks,
-                      show_hyperperiod=args.hps, show_overheads_labels=args.labels, interval=interval)
-    else:
-        simulator = Simulator(task_set)
-        missed_deadline, sim_interval = simulator.run()
-
-        if missed_deadline[0]:
-            print("A deadline was missed at time instant ", missed_deadline[1])
+        start = args.draw_start
+        interval = args.draw_end
+
+        draw_options = dict(show_tick=args.ticks, show_hyperperiod=args.hps, show_overheads_labels=args.labels)
+        # The drawing modules are only imported here, matplotlib and numpy being long to import
+        if args.format == 'png':
+            from draw import draw_schedule
+            draw_function = partial(draw_schedule, exact=args.exact)
+        else:
+            from svg_drawing import draw_svg_schedule
+            draw_function = partial(draw_svg_schedule, html=args.format == 'html')
+
+        if args.pages:
+            # The pages are drawn by worker processes sharing the memory-mapped trace, a temporary one by default
+            trace_filename = args.trace if args.trace else output + ".trace"
+            with TraceWriter(trace_filename) as trace:
+                simulator = create_simulator(args, task_set, config, history=trace)
+                simulator.fast_forward(start)
+                simulator.run(interval)
+
+            task_set.add_task(Task(IDLE_TASK, 0, math.inf, math.inf, 0, 0))
+            from tiled_drawing import draw_tiles
+            filenames = draw_tiles(trace_filename, task_set, config.tick_rate, output, start, interval, args.pages,
+                                   workers=args.workers, draw_function=draw_function, **draw_options)
+            if not args.trace:
+                os.remove(trace_filename)
+            print("The schedule was saved to", len(filenames), "files indexed in ", output + "_index.html")
         else:
-            print("The simulation interval is [0, ", sim_interval, "]")
+            if args.trace:
+                # The schedule is streamed to the trace file and drawn from its memory-mapped copy
+                with TraceWriter(args.trace) as trace:
+                    simulator = create_simulator(args, task_set, config, history=trace)
+                    simulator.fast_forward(start)
+                    simulator.run(interval)
+                with TraceReader(args.trace) as reader:
+                    history = reader.get_window(start, interval)
+            else:
+                simulator = create_simulator(args, task_set, config)
+                # Only the window is recorded, the ticks before it are simulated without history
+                simulator.fast_forward(start)
+                simulator.run(interval)
+                history = simulator.get_history()
+
+            task_set.add_task(Task(IDLE_TASK, 0, math.inf, math.inf, 0, 0))
+            filename = draw_function(history, task_set, config.tick_rate, output, interval=interval, start=start,
+                                     **draw_options)
+            print("The schedule was saved to file ", filename)
+    else:
+        task_set, algorithm, overheads = parse_input_file(args.input)
+        print(get_result_message(args, task_set, algorithm, overheads))
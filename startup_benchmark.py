@@ -0,0 +1,99 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# Modules only needed to draw or to handle arrays, which the interval search must not import
+HEAVY_MODULES = ['numpy', 'matplotlib', 'draw', 'svg_drawing', 'tiled_drawing', 'level_of_detail']
+# Task set of the README, used when no input file is given
+EXAMPLE_INPUT = """Task set
+0 1 8 8 0
+0 2 16 16 0
+0 2 24 24 0
+
+Algorithm
+RM
+
+System overheads
+Tick_rate = 4
+Save = 1
+Load = 1
+Add_ready = 0
+Get_hpt = 0
+Decrement_timer = 0
+Restart_timer = 0
+Resume = 0
+"""
+SIMULATOR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "simulator.py")
+
+
+def get_imported_modules(input_filename):
+    """
+    Runs the interval search once with the import time report of Python.
+
+    :return: the top-level modules imported, with their cumulative import time in microseconds
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", SIMULATOR, "-input", input_filename],
+                            capture_output=True, text=True, check=True)
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # The nested imports are indented
+        if not name.startswith("  "):
+            modules[name.strip()] = int(cumulative)
+    return modules
+
+
+def measure_startup(input_filename, runs):
+    """
+    :return: the wall time in seconds of every run of the interval search
+    """
+    times = []
+    for _ in range(runs):
+        begin = time.perf_counter()
+        subprocess.run([sys.executable, SIMULATOR, "-input", input_filename], stdout=subprocess.DEVNULL, check=True)
+        times.append(time.perf_counter() - begin)
+    return times
+
+
+def run_benchmark(input_filename, runs, limit):
+    """
+    :return: True if no heavy module is imported and the median startup time is below the limit
+    """
+    modules = get_imported_modules(input_filename)
+    heavy = [name for name in modules if name.split(".")[0] in HEAVY_MODULES]
+    slowest = sorted(modules.items(), key=lambda item: item[1], reverse=True)[:5]
+    print("Slowest imports:", ", ".join(f"{name} {cumulative / 1000:.1f} ms" for name, cumulative in slowest))
+
+    times = measure_startup(input_filename, runs)
+    median = statistics.median(times)
+    print(f"Startup and interval search: median {median * 1000:.0f} ms, min {min(times) * 1000:.0f} ms over {runs} runs")
+
+    if heavy:
+        print("Heavy modules imported by the interval search:", ", ".join(heavy))
+    if median > limit:
+        print(f"The median time is above the limit of {limit * 1000:.0f} ms")
+    return not heavy and median <= limit
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-input", help="Filename of the system settings, the example of the README by default")
+    parser.add_argument("-runs", type=int, default=20, help="Number of runs of the interval search")
+    parser.add_argument("-limit", type=float, default=0.5, help="Maximum median time in seconds")
+    args = parser.parse_args()
+
+    if args.input:
+        success = run_benchmark(args.input, args.runs, args.limit)
+    else:
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "example")
+            with open(filename, 'w') as f:
+                f.write(EXAMPLE_INPUT)
+            success = run_benchmark(filename, args.runs, args.limit)
+    sys.exit(0 if success else 1)
@@ -0,0 +1,369 @@
+from html import escape
+
+from drawing_style import LABELED_OVERHEADS, MAX_GRADUATED_INTERVAL, X_LABELS_AMOUNT, get_color, get_first_instant, \
+    get_round_step
+from task import IDLE_TASK
+from utils import ExecutionType
+
+# Layout of the image in pixels
+PLOT_LEFT = 130
+PLOT_TOP = 60
+PLOT_WIDTH = 1400
+ROW_HEIGHT = 96
+MARGIN_RIGHT = 30
+MARGIN_BOTTOM = 70
+# Height of a row in the units of draw.py, in which the heights of the markers are given
+TASK_HEIGHT = 100
+FONT = 'DejaVu Sans, Arial, sans-serif'
+# Width in pixels of the base of the tick wedges
+TICK_WEDGE_WIDTH = 12
+# Path of the hatch of each overhead in an 8 x 8 pixels tile, its legend label and whether it spans all the rows
+OVERHEAD_HATCHES = {
+    ExecutionType.TICK_OVERHEAD: ('M0,0L8,8M8,0L0,8', "Tick overhead", True),
+    ExecutionType.PREEMPTION_OVERHEAD: ('M0,4H8', "Preemption overhead", True),
+    ExecutionType.INIT_OVERHEAD: ('M-2,2L2,-2M0,8L8,0M6,10L10,6', "Initialization overhead", False),
+    ExecutionType.END_JOB_OVERHEAD: ('M-2,6L2,10M0,0L8,8M6,-2L10,2', "End of job overhead", False),
+}
+MISSED_DEADLINE_HATCH = 'M0,0L8,8M8,0L0,8M4,0V8'
+
+HTML_HEADER = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>Schedule</title>
+<style>body { margin: 0; } #schedule { display: block; width: 100vw; height: 100vh; cursor: grab; }</style>
+</head>
+<body>
+"""
+# Zooming with the wheel around the pointer, panning by dragging and resetting with a double click
+HTML_FOOTER = """<script>
+const svg = document.getElementById('schedule');
+const initial = svg.getAttribute('viewBox');
+let [x, y, w, h] = initial.split(' ').map(Number);
+let anchor = null;
+
+function update() {
+    svg.setAttribute('viewBox', `${x} ${y} ${w} ${h}`);
+}
+
+function toSvg(event) {
+    const point = svg.createSVGPoint();
+    point.x = event.clientX;
+    point.y = event.clientY;
+    return point.matrixTransform(svg.getScreenCTM().inverse());
+}
+
+svg.addEventListener('wheel', event => {
+    event.preventDefault();
+    const point = toSvg(event);
+    const factor = event.deltaY > 0 ? 1.25 : 0.8;
+    x = point.x - (point.x - x) * factor;
+    y = point.y - (point.y - y) * factor;
+    w *= factor;
+    h *= factor;
+    update();
+}, {passive: false});
+svg.addEventListener('pointerdown', event => {
+    anchor = toSvg(event);
+    svg.setPointerCapture(event.pointerId);
+});
+svg.addEventListener('pointermove', event => {
+    if (anchor === null) {
+        return;
+    }
+    const point = toSvg(event);
+    x -= point.x - anchor.x;
+    y -= point.y - anchor.y;
+    update();
+});
+svg.addEventListener('pointerup', () => anchor = null);
+svg.addEventListener('dblclick', () => {
+    [x, y, w, h] = initial.split(' ').map(Number);
+    update();
+});
+</script>
+</body>
+</html>
+"""
+
+
+class SvgCanvas:
+    """
+    Writes the elements of the image to a file as soon as they are given. The time and the heights of draw.py, a
+    row being TASK_HEIGHT high with 0 at the bottom of the schedule, are mapped to pixels.
+    """
+
+    def __init__(self, file, start, end, rows_amount):
+        self.file = file
+        self.start = start
+        self.end = end
+        self.rows_amount = rows_amount
+        self.height = rows_amount * TASK_HEIGHT
+        self.pixels_per_unit = PLOT_WIDTH / (end - start)
+        self.plot_bottom = PLOT_TOP + rows_amount * ROW_HEIGHT
+        self.image_width = PLOT_LEFT + PLOT_WIDTH + MARGIN_RIGHT
+        self.image_height = self.plot_bottom + MARGIN_BOTTOM
+
+    def x(self, t):
+        return PLOT_LEFT + (t - self.start) * self.pixels_per_unit
+
+    def y(self, height):
+        return self.plot_bottom - height * ROW_HEIGHT / TASK_HEIGHT
+
+    def write(self, element):
+        self.file.write(element)
+        self.file.write("\n")
+
+    def write_rect(self, start, duration, bottom, height, attributes):
+        x = self.x(start)
+        y = self.y(bottom + height)
+        self.write(f'<rect x="{x:.2f}" y="{y:.2f}" width="{duration * self.pixels_per_unit:.2f}" '
+                   f'height="{height * ROW_HEIGHT / TASK_HEIGHT:.2f}" {attributes}/>')
+
+
+def draw_svg_schedule(history, task_set, tick_rate, filename, show_tick, show_hyperperiod, show_overheads_labels,
+                      interval=-1, start=0, html=False):
+    """
+    Writes the window [start, interval] of the schedule to an SVG image, or to an HTML page embedding it with pan
+    and zoom, with the same marks as draw_schedule. The entries are written while the history is read, so the
+    memory used does not depend on the length of the history, and matplotlib is not needed.
+
+    :return: the filename of the image
+    """
+    tasks = task_set.get_tasks()
+    end = task_set.feasibility_interval if interval == -1 else interval
+    filename += ".html" if html else ".svg"
+
+    with open(filename, 'w') as f:
+        canvas = SvgCanvas(f, start, end, len(tasks))
+        if html:
+            f.write(HTML_HEADER)
+        write_header(canvas, html)
+        write_axes(canvas)
+        found_types = write_entries(canvas, history, show_overheads_labels)
+        write_periods_and_deadlines(canvas, tasks)
+        if show_tick:
+            write_ticks(canvas, tick_rate)
+        if show_hyperperiod:
+            write_hyperperiods(canvas, task_set.hyperperiod)
+        write_legend(canvas, found_types)
+        canvas.write("</svg>")
+        if html:
+            f.write(HTML_FOOTER)
+
+    return filename
+
+
+def write_header(canvas, html):
+    identifier = ' id="schedule"' if html else ''
+    canvas.write(f'<svg xmlns="http://www.w3.org/2000/svg"{identifier} width="{canvas.image_width}" '
+                 f'height="{canvas.image_height}" viewBox="0 0 {canvas.image_width} {canvas.image_height}" '
+                 f'font-family="{FONT}">')
+    canvas.write('<defs>')
+    for exec_type, (path, _, _) in OVERHEAD_HATCHES.items():
+        write_hatch(canvas, f"hatch-{exec_type.value}", path, 'black', 0.5)
+    write_hatch(canvas, "hatch-missed", MISSED_DEADLINE_HATCH, 'black', 1)
+    canvas.write(f'<clipPath id="plot"><rect x="{PLOT_LEFT}" y="{PLOT_TOP}" width="{PLOT_WIDTH}" '
+                 f'height="{canvas.plot_bottom - PLOT_TOP}"/></clipPath>')
+    canvas.write('</defs>')
+    canvas.write(f'<rect width="{canvas.image_width}" height="{canvas.image_height}" fill="white"/>')
+
+
+def write_hatch(canvas, identifier, path, color, opacity):
+    canvas.write(f'<pattern id="{identifier}" width="8" height="8" patternUnits="userSpaceOnUse">'
+                 f'<path d="{path}" stroke="{color}" stroke-opacity="{opacity}" stroke-width="0.8"/></pattern>')
+
+
+def write_axes(canvas):
+    """
+    Writes the names of the rows, the lines between them and the graduations of the time axis with their grid.
+    """
+    for row in range(canvas.rows_amount):
+        label = "Idle task" if row == 0 else "Task " + str(canvas.rows_amount - row)
+        y = canvas.y((row + 0.5) * TASK_HEIGHT)
+        canvas.write(f'<text x="{PLOT_LEFT - 10}" y="{y:.2f}" font-size="18" text-anchor="end" '
+                     f'dominant-baseline="middle">{label}</text>')
+        if row > 0:
+            y = canvas.y(row * TASK_HEIGHT)
+            canvas.write(f'<line x1="{PLOT_LEFT}" y1="{y:.2f}" x2="{PLOT_LEFT + PLOT_WIDTH}" y2="{y:.2f}" '
+                         f'stroke="black"/>')
+
+    # The grid follows every graduation of a short interval and the major ones of a longer interval
+    graduated = canvas.end - canvas.start <= MAX_GRADUATED_INTERVAL
+    for t, major, label in get_x_graduations(canvas.start, canvas.end):
+        x = canvas.x(t)
+        length = 15 if major else 8
+        canvas.write(f'<line x1="{x:.2f}" y1="{canvas.plot_bottom}" x2="{x:.2f}" y2="{canvas.plot_bottom + length}" '
+                     f'stroke="black" stroke-width="{1.2 if major else 1}"/>')
+        if major or graduated:
+            canvas.write(f'<line x1="{x:.2f}" y1="{PLOT_TOP}" x2="{x:.2f}" y2="{canvas.plot_bottom}" stroke="black" '
+                         f'stroke-opacity="0.7" stroke-width="1.15" stroke-dasharray="4,2"/>')
+        if label:
+            canvas.write(f'<text x="{x:.2f}" y="{canvas.plot_bottom + 38}" font-size="18" '
+                         f'text-anchor="middle">{label}</text>')
+
+    canvas.write(f'<rect x="{PLOT_LEFT}" y="{PLOT_TOP}" width="{PLOT_WIDTH}" height="{canvas.plot_bottom - PLOT_TOP}" '
+                 f'fill="none" stroke="black"/>')
+
+
+def get_x_graduations(start, end):
+    """
+    Like draw.py, every time unit is graduated on a short interval with a label every 5 units, and a round step is
+    used on a longer one.
+
+    :return: the list of (instant, whether the graduation is major, label)
+    """
+    if end - start <= MAX_GRADUATED_INTERVAL:
+        return [(t, t % 5 == 0, str(t) if t % 5 == 0 else '') for t in range(start, end + 1)]
+
+    step = get_round_step((end - start) / X_LABELS_AMOUNT)
+    minor_step = step / 5
+    graduations = []
+    first = -(-start // minor_step)
+    for k in range(int(first), int(end // minor_step) + 1):
+        t = k * minor_step
+        major = k % 5 == 0
+        graduations.append((t, major, f"{t:g}" if major else ''))
+    return graduations
+
+
+def write_entries(canvas, history, show_overheads_labels):
+    """
+    Writes the bars of the entries overlapping the window, stopping at the first missed deadline like draw.py.
+
+    :return: the execution types met, in order of first appearance
+    """
+    found_types = {}
+    canvas.write('<g clip-path="url(#plot)">')
+    for idx in range(len(history)):
+        used_time = float(history.durations[idx])
+        if used_time <= 0:
+            continue
+
+        cpu_time = float(history.starts[idx])
+        # The start times are sorted
+        if cpu_time > canvas.end:
+            break
+        if cpu_time + used_time < canvas.start:
+            continue
+
+        task_id = int(history.task_ids[idx])
+        exec_type = ExecutionType(int(history.execution_types[idx]))
+        found_types[exec_type] = True
+
+        if exec_type == ExecutionType.MISSED_DEADLINE:
+            deadline_missed_at = float(history.get_label(idx))
+            bottom = task_id * TASK_HEIGHT
+            canvas.write_rect(deadline_missed_at, used_time, bottom, TASK_HEIGHT,
+                              'fill="red" fill-opacity="0.8" stroke="black" stroke-width="2"')
+            canvas.write_rect(deadline_missed_at, used_time, bottom, TASK_HEIGHT, 'fill="url(#hatch-missed)"')
+            break
+
+        if exec_type in OVERHEAD_HATCHES:
+            full_height = OVERHEAD_HATCHES[exec_type][2]
+            bottom = 0 if full_height else task_id * TASK_HEIGHT
+            height = canvas.height if full_height else TASK_HEIGHT
+            canvas.write_rect(cpu_time, used_time, bottom, height,
+                              'fill="black" fill-opacity="0.1" stroke="black" stroke-width="0.8"')
+            canvas.write_rect(cpu_time, used_time, bottom, height, f'fill="url(#hatch-{exec_type.value})"')
+            if show_overheads_labels and exec_type in LABELED_OVERHEADS:
+                text_y = bottom + TASK_HEIGHT / 2 if exec_type == ExecutionType.END_JOB_OVERHEAD else canvas.height / 2
+                write_overhead_label(canvas, cpu_time + used_time / 2, text_y, history.get_label(idx))
+        else:
+            bottom = 0 if task_id == IDLE_TASK else task_id * TASK_HEIGHT
+            canvas.write_rect(cpu_time, used_time, bottom, TASK_HEIGHT,
+                              f'fill="{get_css_color(get_color(task_id, exec_type))}"')
+    canvas.write('</g>')
+    return list(found_types)
+
+
+def write_overhead_label(canvas, t, height, label):
+    x = canvas.x(t)
+    y = canvas.y(height)
+    canvas.write(f'<text x="{x:.2f}" y="{y:.2f}" font-size="10" font-weight="bold" font-variant="small-caps" '
+                 f'text-anchor="middle" dominant-baseline="middle" transform="rotate(-90 {x:.2f} {y:.2f})">'
+                 f'{escape(str(label))}</text>')
+
+
+def write_periods_and_deadlines(canvas, tasks):
+    """
+    Writes a downward arrow on every release and an ellipse on every deadline, at the top of the row of the task.
+    """
+    canvas.write('<g fill="none" stroke="black" stroke-width="2.5" stroke-linecap="round" stroke-linejoin="round">')
+    for task in tasks[:-1]:
+        top = canvas.y((task.name + 1) * TASK_HEIGHT) + 2
+        tip = canvas.y((task.name + 0.5) * TASK_HEIGHT)
+        period = int(task.period)
+        offset = int(task.offset)
+        for t in range(get_first_instant(canvas.start, offset, period), canvas.end + 1, period):
+            x = canvas.x(t)
+            canvas.write(f'<path d="M{x:.2f},{top:.2f}V{tip:.2f}M{x - 6:.2f},{tip - 12:.2f}L{x:.2f},{tip:.2f}'
+                         f'L{x + 6:.2f},{tip - 12:.2f}"/>')
+    canvas.write('</g>')
+
+    canvas.write('<g fill="none" stroke="black" stroke-width="2">')
+    for task in tasks[:-1]:
+        y = canvas.y((task.name + 1) * TASK_HEIGHT)
+        period = int(task.period)
+        first_deadline = get_first_instant(canvas.start, int(task.offset) + int(task.deadline), period)
+        for t in range(first_deadline, canvas.end + 1, period):
+            canvas.write(f'<ellipse cx="{canvas.x(t):.2f}" cy="{y:.2f}" rx="9" ry="7"/>')
+    canvas.write('</g>')
+
+
+def write_ticks(canvas, tick_rate):
+    # Upward wedges at the bottom of the schedule
+    canvas.write('<g fill="black" stroke="black" stroke-width="2" stroke-linejoin="round">')
+    base = canvas.plot_bottom - 2
+    top = canvas.y(30)
+    first_tick = max(tick_rate, -(-canvas.start // tick_rate) * tick_rate)
+    t = first_tick
+    while t <= canvas.end:
+        x = canvas.x(t)
+        canvas.write(f'<polygon points="{x - TICK_WEDGE_WIDTH / 2:.2f},{base} {x + TICK_WEDGE_WIDTH / 2:.2f},{base} '
+                     f'{x:.2f},{top:.2f}"/>')
+        t += tick_rate
+    canvas.write('</g>')
+
+
+def write_hyperperiods(canvas, hyperperiod):
+    # Upward arrows under the time axis
+    canvas.write('<g fill="black" stroke="black">')
+    bottom = canvas.y(-20)
+    for t in range(get_first_instant(canvas.start, 0, hyperperiod), canvas.end + 1, hyperperiod):
+        x = canvas.x(t)
+        canvas.write(f'<path d="M{x:.2f},{canvas.plot_bottom}L{x - 6:.2f},{canvas.plot_bottom + 10}'
+                     f'L{x - 2:.2f},{canvas.plot_bottom + 8}L{x:.2f},{bottom:.2f}L{x + 2:.2f},'
+                     f'{canvas.plot_bottom + 8}L{x + 6:.2f},{canvas.plot_bottom + 10}Z"/>')
+    canvas.write('</g>')
+
+
+def write_legend(canvas, found_types):
+    """
+    Like draw.py, the legend lists the overheads met when an initialization, tick or preemption overhead was met.
+    """
+    shown_types = {ExecutionType.INIT_OVERHEAD, ExecutionType.TICK_OVERHEAD, ExecutionType.PREEMPTION_OVERHEAD}
+    if not shown_types.intersection(found_types):
+        return
+
+    x = PLOT_LEFT + 10
+    for exec_type in found_types:
+        if exec_type in OVERHEAD_HATCHES:
+            label = OVERHEAD_HATCHES[exec_type][1]
+            canvas.write(f'<rect x="{x}" y="14" width="16" height="24" fill="black" fill-opacity="0.1" '
+                         f'stroke="black" stroke-width="0.8"/>')
+            canvas.write(f'<rect x="{x}" y="14" width="16" height="24" fill="url(#hatch-{exec_type.value})"/>')
+        elif exec_type == ExecutionType.MISSED_DEADLINE:
+            label = "Deadline missed"
+            canvas.write(f'<rect x="{x}" y="14" width="16" height="24" fill="red" fill-opacity="0.8" '
+                         f'stroke="black" stroke-width="2"/>')
+        else:
+            continue
+        canvas.write(f'<text x="{x + 26}" y="26" font-size="16" dominant-baseline="middle">{label}</text>')
+        x += 260
+
+
+def get_css_color(color):
+    if isinstance(color, str):
+        return color
+    return "rgb({})".format(",".join(str(round(255 * component)) for component in color))
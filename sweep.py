@@ -0,0 +1,186 @@
+import argparse
+import csv
+import itertools
+import os
+import queue
+import sys
+import time
+from collections import deque
+from multiprocessing import Pool
+
+from simulation_config import OVERHEAD_KEYS
+from time_base import to_fraction
+from utils import parse_input_file
+
+# Columns of the result table after the overheads
+RESULT_KEYS = ['status', 'miss_time', 'interval', 'overhead_share']
+# A larger tick rate is not a larger overhead, the points are only compared when they have the same tick rate
+COST_KEYS = [key for key in OVERHEAD_KEYS if key != 'Tick_rate']
+
+# Scenario of a worker process, set once by init_worker
+worker_scenario = None
+
+
+def parse_values(text):
+    """
+    Reads the values taken by an overhead, either a list "0,0.5,2" or an inclusive range "START:STOP:STEP". The
+    values of a range are computed exactly, so that "0:1:0.1" gives 0.3 and not 0.30000000000000004.
+
+    :return: the sorted list of distinct values
+    """
+    if ':' in text:
+        start, stop, step = [to_fraction(float(value)) for value in text.split(':')]
+        if step <= 0:
+            raise ValueError(f"The step of the range {text} must be positive")
+        values = [start + index * step for index in range(int((stop - start) / step) + 1)]
+    else:
+        values = [to_fraction(float(value)) for value in text.split(',')]
+    return sorted({float(value) for value in values})
+
+
+def parse_grid(specifications):
+    """
+    Reads the "KEY=VALUES" specifications of the command line, VALUES being given to parse_values.
+
+    :return: the values of every varied overhead, indexed by its key in the input file
+    """
+    grid = {}
+    for specification in specifications:
+        key, _, text = specification.partition('=')
+        if key not in OVERHEAD_KEYS:
+            raise ValueError(f"Unknown overhead {key}, known are {OVERHEAD_KEYS}")
+        grid[key] = parse_values(text)
+        if key == 'Tick_rate' and min(grid[key]) <= 0:
+            raise ValueError("The tick rate must be positive")
+        if min(grid[key]) < 0:
+            raise ValueError(f"The overhead {key} cannot be negative")
+    return grid
+
+
+def get_points(overheads, grid):
+    """
+    Builds every combination of the grid, the overheads which are not varied keeping their value. The points are
+    sorted by increasing overheads, so that the first deadline misses found dominate as many points as possible.
+
+    :return: the list of overheads dictionaries
+    """
+    keys = list(grid)
+    points = [{**overheads, **dict(zip(keys, values))} for values in itertools.product(*grid.values())]
+    points.sort(key=lambda point: (point['Tick_rate'], sum(point[key] for key in COST_KEYS)))
+    return points
+
+
+def is_dominated(point, missed_points):
+    """
+    A point is dominated by a point which misses a deadline with the same tick rate and overheads that are all
+    lower or equal, every job then being delayed at least as much.
+
+    :return: True if a deadline is known to be missed with the overheads of the point
+    """
+    return any(missed['Tick_rate'] == point['Tick_rate'] and all(missed[key] <= point[key] for key in COST_KEYS)
+               for missed in missed_points)
+
+
+def sweep_overheads(task_set, algorithm, overheads, grid, workers=None, prune=True, event_driven=False):
+    """
+    Searches the simulation interval of the task set for every combination of the overheads of the grid, on a pool
+    of worker processes. Only a few points are submitted ahead of the workers, so that a deadline miss stops the
+    points it dominates from being simulated at all unless prune is False.
+
+    :return: a generator of the rows of the result table, in order of completion
+    """
+    points = deque(get_points(overheads, grid))
+    workers = min(workers or os.cpu_count() or 1, len(points))
+    results = queue.Queue()
+    missed_points = []
+    running = 0
+
+    with Pool(workers, initializer=init_worker, initargs=(task_set, algorithm, event_driven)) as pool:
+        while points or running:
+            while points and running < 2 * workers:
+                point = points.popleft()
+                if prune and is_dominated(point, missed_points):
+                    yield {**point, 'status': 'dominated', 'miss_time': None, 'interval': None,
+                           'overhead_share': None}
+                    continue
+                pool.apply_async(evaluate_point, (point,), callback=results.put, error_callback=results.put)
+                running += 1
+
+            if running:
+                row = results.get()
+                running -= 1
+                if isinstance(row, BaseException):
+                    raise row
+                if row['status'] == 'missed' and not is_dominated(row, missed_points):
+                    missed_points.append(row)
+                yield row
+
+
+def init_worker(task_set, algorithm, event_driven):
+    global worker_scenario
+    worker_scenario = (task_set, algorithm, event_driven)
+
+
+def evaluate_point(point):
+    """
+    Simulates one point of the grid in a worker process.
+
+    :return: the row of the result table
+    """
+    from simulation_config import SimulationConfig
+    from simulator import Simulator
+
+    task_set, algorithm, event_driven = worker_scenario
+    simulator = Simulator(task_set, SimulationConfig.from_overheads(point, algorithm), event_driven=event_driven,
+                          record_history=False)
+    (missed_deadline, miss_time), interval = simulator.run()
+    if missed_deadline:
+        return {**point, 'status': 'missed', 'miss_time': miss_time, 'interval': None,
+                'overhead_share': simulator.get_overhead_share()}
+    return {**point, 'status': 'met', 'miss_time': None, 'interval': interval,
+            'overhead_share': simulator.get_overhead_share()}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Simulates a task set for every combination of a grid of overheads")
+    parser.add_argument("-input", help="Filename of the system settings", required=True)
+    parser.add_argument("-vary",
+                        action='append',
+                        metavar='KEY=VALUES',
+                        required=True,
+                        help="Values of an overhead of the input file, either a list such as Save=0,0.5,1 or an "
+                             "inclusive range START:STOP:STEP such as Save=0:2:0.25. Can be repeated")
+    parser.add_argument("-output", help="Filename of the CSV result table, the standard output by default")
+    parser.add_argument("-workers",
+                        metavar='N',
+                        type=int,
+                        help="Number of worker processes, all the cores by default")
+    parser.add_argument("-events",
+                        help="Use the event-driven engine which skips the ticks where nothing can happen",
+                        action="store_true")
+    parser.add_argument("-all",
+                        help="Simulate every point, even those dominated by a point missing a deadline",
+                        action="store_true")
+    args = parser.parse_args()
+
+    try:
+        grid = parse_grid(args.vary)
+    except ValueError as e:
+        parser.error(str(e))
+    task_set, algorithm, overheads = parse_input_file(args.input)
+
+    begin = time.perf_counter()
+    counts = {'met': 0, 'missed': 0, 'dominated': 0}
+    f = open(args.output, 'w', newline='') if args.output else sys.stdout
+    # Every row is written as soon as its point is simulated, so a long sweep can be followed while it runs
+    writer = csv.DictWriter(f, OVERHEAD_KEYS + RESULT_KEYS)
+    writer.writeheader()
+    for row in sweep_overheads(task_set, algorithm, overheads, grid, args.workers, not args.all, args.events):
+        writer.writerow(row)
+        f.flush()
+        counts[row['status']] += 1
+    if args.output:
+        f.close()
+
+    print(f"{sum(counts.values())} points: {counts['met']} meet all the deadlines, {counts['missed']} miss one and "
+          f"{counts['dominated']} were skipped as dominated, in {time.perf_counter() - begin:.1f} s", file=sys.stderr)
@@ -0,0 +1,139 @@
+import bisect
+import math
+from fractions import Fraction
+
+from time_base import to_fraction
+from utils import create_task_set
+
+UTILIZATION_METHODS = ['uunifast', 'randfixedsum']
+
+
+def uunifast(rng, tasks_amount, utilization):
+    """
+    Draws the utilizations of the tasks uniformly among those summing to the given utilization (Bini and Buttazzo).
+
+    :return: the list of the utilizations of the tasks
+    """
+    utilizations = []
+    remaining = utilization
+    for index in range(1, tasks_amount):
+        next_remaining = remaining * rng.random() ** (1 / (tasks_amount - index))
+        utilizations.append(remaining - next_remaining)
+        remaining = next_remaining
+    utilizations.append(remaining)
+    return utilizations
+
+
+def randfixedsum(rng, tasks_amount, utilization, max_task_utilization=1):
+    """
+    Draws the utilizations of the tasks uniformly among those summing to the given utilization with every task
+    utilization at most max_task_utilization, with the algorithm of Stafford used by Emberson et al. Without the
+    bound, the distribution is the one of UUniFast.
+
+    :return: the list of the utilizations of the tasks
+    """
+    if utilization > tasks_amount * max_task_utilization:
+        raise Exception(f"A utilization of {utilization} cannot be split into {tasks_amount} tasks of utilization at "
+                        f"most {max_task_utilization}")
+    if tasks_amount == 1:
+        return [utilization]
+
+    # The values are drawn in the unit cube, then scaled to the bound
+    n = tasks_amount
+    s = utilization / max_task_utilization
+    k = min(int(s), n - 1)
+    s1 = [s - (k - i) for i in range(n)]
+    s2 = [(k + n - i) - s for i in range(n)]
+
+    # Transition probabilities between the simplices cutting the cube
+    w = [[0.0] * (n + 1) for _ in range(n)]
+    w[0][1] = math.ulp(0) ** -0.5
+    t = [[0.0] * n for _ in range(n - 1)]
+    for i in range(2, n + 1):
+        for j in range(i):
+            low = w[i - 2][j + 1] * s1[j] / i
+            high = w[i - 2][j] * s2[n - i + j] / i
+            w[i - 1][j + 1] = low + high
+            total = w[i - 1][j + 1] + math.ulp(0)
+            t[i - 2][j] = high / total if s2[n - i + j] > s1[j] else 1 - low / total
+
+    values = []
+    column = k + 1
+    position_sum = 0
+    product = 1
+    for i in range(n - 1, 0, -1):
+        moves = rng.random() <= t[i - 1][column - 1]
+        coordinate = rng.random() ** (1 / i)
+        position_sum += (1 - coordinate) * product * s / (i + 1)
+        product *= coordinate
+        values.append(position_sum + product * moves)
+        s -= moves
+        column -= moves
+    values.append(position_sum + product * s)
+
+    # The values are drawn in a fixed order of the dimensions
+    rng.shuffle(values)
+    return [value * max_task_utilization for value in values]
+
+
+def get_divisors(number, low, high):
+    """
+    :return: the sorted divisors of the number in [low, high]
+    """
+    divisors = set()
+    for divisor in range(1, math.isqrt(number) + 1):
+        if number % divisor == 0:
+            divisors.update([divisor, number // divisor])
+    return sorted(divisor for divisor in divisors if low <= divisor <= high)
+
+
+def get_log_uniform_periods(rng, tasks_amount, min_period, max_period, max_hyperperiod=None):
+    """
+    Draws integer periods log-uniformly in [min_period, max_period]. With max_hyperperiod, the periods are rounded in
+    the logarithmic scale to the closest divisor of max_hyperperiod, so that the hyperperiod of the task set divides
+    it. A number with many divisors, such as 3600 or 720720, keeps the periods spread over the range.
+
+    :return: the list of the periods
+    """
+    candidates = get_divisors(max_hyperperiod, min_period, max_period) if max_hyperperiod else None
+    if candidates == []:
+        raise Exception(f"{max_hyperperiod} has no divisor between {min_period} and {max_period}")
+
+    periods = []
+    for _ in range(tasks_amount):
+        log_period = rng.uniform(math.log(min_period), math.log(max_period + 1))
+        if candidates is None:
+            periods.append(min(int(math.exp(log_period)), max_period))
+            continue
+        index = bisect.bisect_left(candidates, math.exp(log_period))
+        neighbours = candidates[max(index - 1, 0):index + 1]
+        periods.append(min(neighbours, key=lambda period: abs(math.log(period) - log_period)))
+    return periods
+
+
+def generate_task_set(rng, tasks_amount, utilization, min_period, max_period, max_hyperperiod=None,
+                      method='uunifast', wcet_granularity=0.01):
+    """
+    Generates synchronous tasks with implicit deadlines. The WCETs are rounded to a multiple of wcet_granularity, at
+    least one, so the utilization of the task set is close to but not exactly the requested one.
+
+    :return: a TaskSet with the tasks named like in an input file
+    """
+    if method not in UTILIZATION_METHODS:
+        raise Exception(f"Unknown utilization method {method}, known are {UTILIZATION_METHODS}")
+    if method == 'uunifast':
+        utilizations = uunifast(rng, tasks_amount, utilization)
+    else:
+        utilizations = randfixedsum(rng, tasks_amount, utilization)
+    periods = get_log_uniform_periods(rng, tasks_amount, min_period, max_period, max_hyperperiod)
+
+    granularity = to_fraction(wcet_granularity)
+    task_parameters = []
+    for task_utilization, period in zip(utilizations, periods):
+        wcet = max(1, round(Fraction(task_utilization) * period / granularity)) * granularity
+        task_parameters.append([0, float(wcet), period, period, 0])
+    return create_task_set(task_parameters)
+
+
+def get_utilization(task_set):
+    return sum(task.WCET / task.period for task in task_set.get_tasks())
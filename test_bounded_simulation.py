@@ -0,0 +1,66 @@
+import math
+import random
+
+from simulation_config import SimulationConfig
+from simulator import Simulator
+from utils import Bound, SchedulerType, create_task_set
+
+PERIODS = [4, 6, 8, 10, 12, 16, 20, 24]
+WCETS = [0.25, 0.5, 1, 1.5, 2]
+
+
+def get_random_scenario(rng):
+    """
+    :return: a small task set with offsets and constrained deadlines, and a configuration with non-null timer and
+    ready queue overheads
+    """
+    tasks = []
+    for _ in range(rng.randint(1, 4)):
+        period = rng.choice(PERIODS)
+        wcet = rng.choice(WCETS)
+        deadline = rng.choice([period, max(wcet, period // 2)])
+        tasks.append([rng.choice([0, 0, 0, 2, 5]), wcet, period, deadline, rng.choice([0, 0, 0.25, 0.5])])
+    overheads = {'Tick_rate': rng.choice([1, 2, 3]), 'Save': rng.choice([0, 0.25]), 'Load': rng.choice([0, 0.25]),
+                 'Add_ready': rng.choice([0.25, 0.5]), 'Get_hpt': rng.choice([0, 0.25]),
+                 'Decrement_timer': rng.choice([0.25, 0.5, 1]), 'Restart_timer': rng.choice([0.25, 0.5, 1]),
+                 'Resume': rng.choice([0, 0.25])}
+    return create_task_set(tasks), SimulationConfig.from_overheads(overheads, rng.choice(list(SchedulerType)))
+
+
+def test_jobs_released_at_zero_are_not_the_worst_case():
+    # The job released at 0 pays no timer overhead, the later ones miss their deadline
+    task_set = create_task_set([[0, 1, 10, 2, 0.5]])
+    config = SimulationConfig.from_overheads({'Tick_rate': 2, 'Save': 0, 'Load': 0, 'Add_ready': 0.25, 'Get_hpt': 0.25,
+                                              'Decrement_timer': 1, 'Restart_timer': 1, 'Resume': 0},
+                                             SchedulerType.EDF)
+
+    result = Simulator(task_set, config, record_history=False).find_bounded_interval()
+
+    assert result == ((True, 12.0), 12.0, None)
+
+
+def test_bound_matches_run_over_a_longer_horizon():
+    rng = random.Random(0)
+    for event_driven in [False, True]:
+        for _ in range(150):
+            task_set, config = get_random_scenario(rng)
+            missed_deadline, proof_time, bound = Simulator(task_set, config, event_driven=event_driven,
+                                                           record_history=False).find_bounded_interval()
+
+            # Past the proof, the schedule repeats: a longer run gives the same result
+            horizon = proof_time + 2 * math.lcm(int(task_set.hyperperiod), int(config.tick_rate))
+            assert Simulator(task_set, config, record_history=False).run(horizon) == missed_deadline
+            assert (bound is None) == missed_deadline[0]
+
+
+def test_runtime_estimate_does_not_move_the_simulator():
+    task_set = create_task_set([[0, 1, 8, 8, 0], [0, 2, 16, 16, 0], [0, 2, 24, 24, 0]])
+    config = SimulationConfig.from_overheads({'Tick_rate': 4, 'Save': 1, 'Load': 1, 'Add_ready': 0, 'Get_hpt': 0,
+                                              'Decrement_timer': 0, 'Restart_timer': 0, 'Resume': 0},
+                                             SchedulerType.RM)
+    simulator = Simulator(task_set, config, record_history=False)
+
+    simulator.estimate_bounded_runtime()
+
+    assert simulator.current_time == 0
+    assert simulator.find_bounded_interval() == ((False, 0.0), 140.0, Bound.IDLE_INSTANT)
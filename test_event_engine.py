@@ -0,0 +1,64 @@
+import random
+
+import pytest
+
+from simulation_config import SimulationConfig
+from simulator import Simulator
+from utils import SchedulerType, create_task_set
+
+PERIODS = [4, 5, 6, 8, 10, 12, 16, 20, 24, 40]
+WCETS = [0.25, 0.5, 1, 1.5]
+
+
+def get_random_scenario(rng, algorithm):
+    """
+    :return: a task set with offsets, constrained deadlines and shared periods, and a configuration with non-null
+    overheads for the given algorithm
+    """
+    tasks = []
+    for _ in range(rng.randint(1, 4)):
+        period = rng.choice(PERIODS)
+        wcet = rng.choice(WCETS)
+        deadline = rng.choice([period, period, max(wcet, period // 2)])
+        tasks.append([rng.choice([0, 0, 0, 1, 2, 5]), wcet, period, deadline, rng.choice([0, 0, 0.25, 0.5])])
+    overheads = {'Tick_rate': rng.choice([2, 3, 4, 5]), 'Save': 0.25, 'Load': rng.choice([0, 0.25]),
+                 'Add_ready': rng.choice([0, 0.25]), 'Get_hpt': rng.choice([0, 0.25]),
+                 'Decrement_timer': rng.choice([0.25, 0.5]), 'Restart_timer': rng.choice([0, 0.25]),
+                 'Resume': rng.choice([0, 0.25])}
+    return create_task_set(tasks), SimulationConfig.from_overheads(overheads, algorithm)
+
+
+def get_columns(history):
+    return (list(history.starts), list(history.durations), list(history.task_ids), list(history.execution_types),
+            [history.get_label(index) for index in range(len(history))])
+
+
+@pytest.mark.parametrize('algorithm', [SchedulerType.RM, SchedulerType.EDF])
+def test_event_driven_engine_matches_the_tick_engine(algorithm):
+    rng = random.Random(algorithm.value)
+    for _ in range(150):
+        task_set, config = get_random_scenario(rng, algorithm)
+        simulators = [Simulator(task_set, config, event_driven=event_driven) for event_driven in [False, True]]
+
+        # Same interval search result, the quiet ticks skipped by the event-driven engine included
+        results = [simulator.run() for simulator in simulators]
+        assert results[0] == results[1]
+
+        histories = [simulator.get_history() for simulator in simulators]
+        assert get_columns(histories[0]) == get_columns(histories[1])
+
+
+@pytest.mark.parametrize('algorithm', [SchedulerType.RM, SchedulerType.EDF])
+def test_event_driven_engine_matches_the_tick_engine_until_a_horizon(algorithm):
+    rng = random.Random(10 + algorithm.value)
+    for _ in range(100):
+        task_set, config = get_random_scenario(rng, algorithm)
+        horizon = rng.choice([48, 120, 240])
+        simulators = [Simulator(task_set, config, event_driven=event_driven) for event_driven in [False, True]]
+
+        results = [simulator.run(horizon) for simulator in simulators]
+        assert results[0] == results[1]
+        assert simulators[0].current_time == simulators[1].current_time
+
+        histories = [simulator.get_history() for simulator in simulators]
+        assert get_columns(histories[0]) == get_columns(histories[1])
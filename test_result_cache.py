@@ -0,0 +1,40 @@
+import itertools
+import random
+
+from result_cache import ResultCache, get_cache_key, simulate
+from simulation_config import SimulationConfig
+from simulator import Simulator
+from utils import SchedulerType, create_task_set
+
+TASKS = [[0, 3, 24, 12, 0.5], [0, 1, 4, 1, 0], [0, 1, 12, 12, 0], [0, 1, 20, 8, 1], [0, 1, 6, 6, 0]]
+OVERHEADS = {'Tick_rate': 1, 'Save': 0.25, 'Load': 0, 'Add_ready': 0.5, 'Get_hpt': 0, 'Decrement_timer': 1,
+             'Restart_timer': 1, 'Resume': 0}
+
+
+def test_permuted_rm_task_sets_get_their_own_results():
+    config = SimulationConfig.from_overheads(OVERHEADS, SchedulerType.RM)
+    permutations = list(itertools.permutations(TASKS))
+    random.Random(0).shuffle(permutations)
+
+    cache = ResultCache()
+    for permutation in permutations[:40]:
+        task_set = create_task_set(list(permutation))
+        expected = Simulator(task_set, config, record_history=False).run()
+        assert simulate(task_set, config, cache=cache) == expected
+
+    # The same tasks in another order miss a deadline at another instant
+    first = create_task_set(TASKS)
+    second = create_task_set([TASKS[1], TASKS[4], TASKS[3], TASKS[0], TASKS[2]])
+    assert get_cache_key(first, config, 'interval') != get_cache_key(second, config, 'interval')
+    assert simulate(first, config, cache=cache)[0] == (True, 6.0)
+    assert simulate(second, config, cache=cache)[0] == (True, 5.0)
+
+
+def test_repeated_query_hits_the_disk_cache(tmp_path):
+    config = SimulationConfig.from_overheads(OVERHEADS, SchedulerType.RM)
+    task_set = create_task_set(TASKS)
+    result = simulate(task_set, config, cache=ResultCache(tmp_path))
+
+    cache = ResultCache(tmp_path)
+    assert simulate(task_set, config, cache=cache) == result
+    assert (cache.hits, cache.misses) == (1, 0)
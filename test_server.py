@@ -0,0 +1,45 @@
+import json
+
+from server import handle_request, serve_stream
+
+SCENARIO = {'tasks': [[0, 1, 8, 8, 0], [0, 2, 16, 16, 0], [0, 2, 24, 24, 0]], 'algorithm': 'RM',
+            'overheads': {'Tick_rate': 4, 'Save': 1, 'Load': 1, 'Add_ready': 0, 'Get_hpt': 0, 'Decrement_timer': 0,
+                          'Restart_timer': 0, 'Resume': 0}}
+
+
+class FailingPool:
+    """
+    Pool whose workers fail outside of handle_request, e.g. when the response cannot be sent back.
+    """
+
+    class Result:
+        def wait(self):
+            pass
+
+    def apply_async(self, function, arguments, callback=None, error_callback=None):
+        error_callback(RuntimeError("worker lost"))
+        return self.Result()
+
+
+def test_run_mode_without_horizon_is_a_readable_error():
+    response = handle_request({**SCENARIO, 'id': 1, 'mode': 'run'})
+
+    assert response['status'] == 'error'
+    assert 'horizon' in response['error'] and 'KeyError' not in response['error']
+
+
+def test_run_mode_with_horizon():
+    response = handle_request({**SCENARIO, 'id': 1, 'mode': 'run', 'horizon': 48})
+
+    assert response == {'id': 1, 'horizon': 48, 'missed_deadline': None, 'status': 'ok'}
+
+
+def test_every_request_gets_a_response():
+    messages = []
+    lines = [json.dumps({**SCENARIO, 'id': request_id}) for request_id in range(3)]
+
+    serve_stream(FailingPool(), lines, messages.append)
+
+    responses = [json.loads(message) for message in messages]
+    assert [response['id'] for response in responses] == [0, 1, 2]
+    assert all(response['status'] == 'error' for response in responses)
@@ -0,0 +1,31 @@
+from trace_file import TraceReader, TraceWriter
+from utils import ExecutionType
+
+
+def write_trace(filename, entries_amount, chunk_size=16):
+    with TraceWriter(filename, chunk_size) as trace:
+        for index in range(entries_amount):
+            trace.record(index % 3, 1.0, ExecutionType.TASK, "LABEL" if index % 2 else "")
+
+
+def test_window_outlives_the_reader(tmp_path):
+    filename = str(tmp_path / "test.trace")
+    write_trace(filename, 100)
+
+    with TraceReader(filename) as reader:
+        window = reader.get_window(10, 20)
+
+    assert list(window.starts) == [float(start) for start in range(10, 21)]
+    assert list(window.task_ids) == [start % 3 for start in range(10, 21)]
+    assert window.get_label(1) == "LABEL"
+
+
+def test_reader_closes_while_a_view_is_alive(tmp_path):
+    filename = str(tmp_path / "test.trace")
+    write_trace(filename, 100)
+
+    with TraceReader(filename) as reader:
+        view = reader.get_view()
+
+    assert len(view) == 100
+    assert view.starts[99] == 99.0
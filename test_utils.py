@@ -0,0 +1,24 @@
+import sys
+
+import pytest
+
+from utils import parse_arguments
+
+
+def parse(monkeypatch, *arguments):
+    monkeypatch.setattr(sys, 'argv', ['simulator.py', '-input', 'test', *arguments])
+    return parse_arguments()
+
+
+@pytest.mark.parametrize('window', [['5', '5'], ['5', '2'], ['-3'], ['0'], ['-1', '4'], ['x'], ['1', '2.5']])
+def test_invalid_draw_window_is_rejected(monkeypatch, window):
+    with pytest.raises(SystemExit):
+        parse(monkeypatch, '-draw', 'output', *window)
+
+
+def test_draw_window(monkeypatch):
+    args = parse(monkeypatch, '-draw', 'output', '96', '144')
+    assert (args.draw_start, args.draw_end) == (96, 144)
+
+    args = parse(monkeypatch, '-draw', 'output', '48')
+    assert (args.draw_start, args.draw_end) == (0, 48)
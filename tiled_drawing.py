@@ -0,0 +1,84 @@
+import html
+import os
+from multiprocessing import Pool
+
+from trace_file import TraceReader
+
+# State of a worker process, set once by init_worker
+worker_trace = None
+worker_settings = None
+
+
+def get_pages(start, end, page_width):
+    """
+    Splits the interval [start, end] into consecutive pages of page_width time units, the last one being shorter if
+    needed.
+
+    :return: the list of (page_start, page_end)
+    """
+    return [(page_start, min(page_start + page_width, end)) for page_start in range(start, end, page_width)]
+
+
+def get_page_filename(output, index):
+    return f"{output}_{index:03d}"
+
+
+def draw_tiles(trace_filename, task_set, tick_rate, output, start, end, page_width, workers=None,
+               draw_function=None, **draw_options):
+    """
+    Draws the window [start, end] of the schedule streamed to a trace file as pages of page_width time units, saved
+    to OUTPUT_000.png, OUTPUT_001.png and so on, and writes an index of the pages to OUTPUT_index.html. The pages
+    are drawn by draw_function, draw_schedule by default or draw_svg_schedule, which returns the filename of the page.
+
+    The pages are drawn by a pool of worker processes. Each worker memory-maps the trace once and only reads the
+    records of the page it draws, so the trace is shared through the page cache and the memory of a worker only
+    depends on the page width.
+
+    :return: the filenames of the images, in the order of the pages
+    """
+    if draw_function is None:
+        from draw import draw_schedule
+        draw_function = draw_schedule
+
+    pages = get_pages(start, end, page_width)
+    jobs = [(index, page_start, page_end, get_page_filename(output, index))
+            for index, (page_start, page_end) in enumerate(pages)]
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+
+    with Pool(workers, initializer=init_worker,
+              initargs=(trace_filename, task_set, tick_rate, draw_function, draw_options)) as pool:
+        filenames = list(pool.imap(draw_page, jobs))
+
+    write_index(output, pages, filenames)
+    return filenames
+
+
+def init_worker(trace_filename, task_set, tick_rate, draw_function, draw_options):
+    global worker_trace, worker_settings
+    worker_trace = TraceReader(trace_filename)
+    worker_settings = (task_set, tick_rate, draw_function, draw_options)
+
+
+def draw_page(job):
+    """
+    Draws one page in a worker process.
+
+    :return: the filename of the image
+    """
+    index, page_start, page_end, filename = job
+    task_set, tick_rate, draw_function, draw_options = worker_settings
+    history = worker_trace.get_window(page_start, page_end)
+    return draw_function(history, task_set, tick_rate, filename, interval=page_end, start=page_start, **draw_options)
+
+
+def write_index(output, pages, filenames):
+    """
+    Writes an HTML page showing the images one below the other with their time windows.
+    """
+    with open(output + "_index.html", 'w') as f:
+        f.write(f"<!DOCTYPE html>\n<html>\n<head><title>{html.escape(os.path.basename(output))}</title></head>\n"
+                f"<body>\n")
+        for (page_start, page_end), filename in zip(pages, filenames):
+            source = html.escape(os.path.basename(filename))
+            f.write(f"<h2>[{page_start}, {page_end}]</h2>\n<img src=\"{source}\" style=\"width: 100%\">\n")
+        f.write("</body>\n</html>\n")
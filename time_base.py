@@ -0,0 +1,70 @@
+import math
+from fractions import Fraction
+
+from task import Task
+
+
+def to_fraction(value):
+    """
+    Converts a time value to an exact fraction. Floats are converted from their shortest representation, so that
+    a value parsed from "0.1" gives 1/10 and not the binary approximation of 0.1.
+
+    :return: the value as a Fraction
+    """
+    if isinstance(value, float):
+        return Fraction(repr(value))
+    return Fraction(value)
+
+
+class TimeBase:
+    """
+    Integer time base of the simulation engine. Every time value is expressed as an integer number of units, a unit
+    being 1 / resolution of the time unit used in the input file. The resolution is the smallest one representing
+    exactly all the parameters of the tasks and all the overheads, so the engine never accumulates rounding errors.
+    """
+
+    def __init__(self, resolution=1):
+        self.resolution = resolution
+
+    @staticmethod
+    def from_values(values):
+        resolution = 1
+        for value in values:
+            if not math.isinf(value):
+                resolution = math.lcm(resolution, to_fraction(value).denominator)
+        return TimeBase(resolution)
+
+    def to_units(self, value):
+        """
+        Converts a time value given in the unit of the input file to the integer unit of the engine.
+
+        :return: the integer number of units, infinite values are kept as they are
+        """
+        if math.isinf(value):
+            return value
+
+        units = to_fraction(value) * self.resolution
+        if units.denominator != 1:
+            raise Exception(f"The time value {value} cannot be represented with a resolution of {self.resolution}")
+        return int(units)
+
+    def to_time(self, units):
+        """
+        Converts a number of units of the engine back to the unit of the input file.
+
+        :return: the time value as a float
+        """
+        return units / self.resolution
+
+    def scale_task(self, task):
+        """
+        Creates a copy of a task with all its parameters expressed in the unit of the engine.
+
+        :return: the scaled task
+        """
+        return Task(task.name, self.to_units(task.offset), self.to_units(task.WCET), self.to_units(task.period),
+                    self.to_units(task.deadline), self.to_units(task.init_overhead))
+
+
+def get_task_values(task):
+    return [task.offset, task.WCET, task.period, task.deadline, task.init_overhead]
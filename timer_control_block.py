@@ -1,11 +1,37 @@
+import heapq
+
+from job import Job
 from task import Task
 
 
 class TimerControlBlock:
-    def __init__(self, task: Task):
+    """
+    Run-time state of a task in a simulator: its timer, the number of jobs it released, the remaining time of its
+    initialization and the processor time used since its last release. The Task itself only holds parameters, so a
+    task set can be simulated several times and by several simulators at once.
+    """
+
+    def __init__(self, task: Task, index=0):
         self.task = task
+        self.index = index
         self.period = task.period
-        self.timer = self.get_initial_timer()
+        # The timer is stored as the absolute instant at which it reaches zero instead of a value decremented on
+        # every tick. It expires on the first tick happening at or after this instant.
+        self.release_time = self.get_initial_timer()
+        self.restart_time = 0
+        self.job_counter = 0
+        self.remaining_init_time = task.init_overhead
+        self.cumulative_cpu_time = 0
+
+    def release_job(self):
+        """
+        Creates the next job of the task
+
+        :return: a new Job for the task
+        """
+        absolute_deadline = self.task.offset + self.job_counter * self.task.period + self.task.deadline
+        self.job_counter += 1
+        return Job(self.task, absolute_deadline, self)
 
     def get_initial_timer(self):
         if self.task.offset == 0:
@@ -13,20 +39,52 @@ class TimerControlBlock:
         else:
             return self.task.offset
 
-    def restart(self):
-        self.task.time_since_last_quest = 0
-        self.task.cumulative_cpu_time = 0
-        self.timer = self.period + self.timer  # Add the negative value of the timer to handle release jiter
+    def get_timer(self, current_time):
+        return self.release_time - current_time
 
-    def decrement(self, tick_rate):
-        self.task.time_since_last_quest += tick_rate
-        self.timer -= tick_rate
+    def get_time_since_last_quest(self, current_time):
+        return current_time - self.restart_time
 
-        if self.timer <= 0:
-            self.restart()
-            return True
+    def restart(self, current_time):
+        self.restart_time = current_time
+        self.cumulative_cpu_time = 0
+        # The next release is computed from the previous one and not from the current time, which keeps the delay
+        # of the expiry to handle release jiter
+        self.release_time += self.period
 
-        return False
+    def has_expired(self, current_time):
+        return self.release_time <= current_time
 
     def get_task(self):
         return self.task
+
+
+class TimerQueue:
+    """
+    Min-heap of timer control blocks ordered by their next expiry. Only the timers expiring on a tick are touched,
+    so the cost of a tick does not depend on the number of tasks.
+    """
+
+    def __init__(self, timers):
+        self.heap = [(timer.release_time, timer.index, timer) for timer in timers]
+        heapq.heapify(self.heap)
+
+    def get_next_release_time(self):
+        return self.heap[0][0]
+
+    def expire(self, current_time):
+        """
+        Restarts all the timers that expire at the current time.
+
+        :return: the expired timers, in the order of the timer list
+        """
+        expired_timers = []
+        while self.heap and self.heap[0][0] <= current_time:
+            expired_timers.append(heapq.heappop(self.heap)[2])
+
+        expired_timers.sort(key=lambda timer: timer.index)
+        for timer in expired_timers:
+            timer.restart(current_time)
+            heapq.heappush(self.heap, (timer.release_time, timer.index, timer))
+
+        return expired_timers
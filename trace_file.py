@@ -0,0 +1,199 @@
+import json
+import mmap
+import struct
+from bisect import bisect_right
+
+from history import NO_LABEL
+from utils import ExecutionType
+
+MAGIC = b'RTTRACE1'
+# magic, number of records, offset of the footer, number of records per chunk
+HEADER = struct.Struct('<8sQQI')
+# start, duration, task name, execution type code, label code
+RECORD = struct.Struct('<ddibh')
+DEFAULT_CHUNK_SIZE = 65536
+
+
+class TraceWriter:
+    """
+    Streams the schedule to a binary file while the simulation runs. It can be given to the simulator in place of
+    the in-memory History, only one chunk of records is kept in memory.
+
+    The file holds a fixed-size header, the packed records and a JSON footer with the label table and the start
+    time of every chunk.
+    """
+
+    def __init__(self, filename, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.filename = filename
+        self.chunk_size = chunk_size
+        self.file = open(filename, 'w+b')
+        self.file.write(HEADER.pack(MAGIC, 0, 0, chunk_size))
+        self.buffer = bytearray()
+        self.buffered_records = 0
+        self.written_records = 0
+        self.chunk_starts = []
+        self.labels = [NO_LABEL]
+        self.label_table = {NO_LABEL: 0}
+        self.clock = 0.0
+
+    def record(self, task_id, duration, execution_type, label=NO_LABEL):
+        label_code = self.label_table.get(label)
+        if label_code is None:
+            label_code = len(self.labels)
+            self.labels.append(label)
+            self.label_table[label] = label_code
+
+        self.__append(self.clock, duration, task_id, execution_type.value, label_code)
+        if duration > 0:
+            self.clock += duration
+
+    def record_missed_deadline(self, task_id, deadline):
+        self.record(task_id, 2, ExecutionType.MISSED_DEADLINE, deadline)
+
+    def repeat(self, mark, count):
+        """
+        Appends the records written since the given mark again, count times, shifting their start times.
+        """
+        if count <= 0:
+            return
+
+        pattern = list(RECORD.iter_unpack(self.__read_since(mark)))
+        if not pattern:
+            return
+
+        span = self.clock - pattern[0][0]
+        for k in range(1, count + 1):
+            for start, duration, task_id, execution_type, label_code in pattern:
+                self.__append(start + k * span, duration, task_id, execution_type, label_code)
+        self.clock += count * span
+
+    def get_size(self):
+        return self.written_records + self.buffered_records
+
+    def close(self):
+        self.__flush()
+        footer_offset = self.file.tell()
+        footer = {'labels': self.labels, 'chunk_starts': self.chunk_starts}
+        self.file.write(json.dumps(footer).encode())
+        self.file.seek(0)
+        self.file.write(HEADER.pack(MAGIC, self.written_records, footer_offset, self.chunk_size))
+        self.file.close()
+
+    def __append(self, start, duration, task_id, execution_type, label_code):
+        if self.buffered_records == 0:
+            self.chunk_starts.append(start)
+        self.buffer += RECORD.pack(start, duration, task_id, execution_type, label_code)
+        self.buffered_records += 1
+        if self.buffered_records == self.chunk_size:
+            self.__flush()
+
+    def __flush(self):
+        self.file.write(self.buffer)
+        self.written_records += self.buffered_records
+        self.buffer = bytearray()
+        self.buffered_records = 0
+
+    def __read_since(self, mark):
+        if mark >= self.written_records:
+            return bytes(self.buffer[(mark - self.written_records) * RECORD.size:])
+
+        # The records were already flushed, they are read back from the file
+        self.file.seek(HEADER.size + mark * RECORD.size)
+        data = self.file.read((self.written_records - mark) * RECORD.size)
+        self.file.seek(0, 2)
+        return data + bytes(self.buffer)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class TraceReader:
+    """
+    Reads back a trace written by a TraceWriter. The file is memory-mapped and the records are exposed as a NumPy
+    structured array sharing its memory, so only the pages of the records actually accessed are loaded.
+    """
+
+    def __init__(self, filename):
+        import numpy as np
+
+        with open(filename, 'rb') as f:
+            self.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, records_amount, footer_offset, self.chunk_size = HEADER.unpack_from(self.mmap)
+        if magic != MAGIC:
+            raise Exception(f"{filename} is not a trace file")
+
+        footer = json.loads(self.mmap[footer_offset:])
+        self.labels = footer['labels']
+        self.chunk_starts = footer['chunk_starts']
+        self.records = np.frombuffer(self.mmap, dtype=get_record_dtype(), count=records_amount, offset=HEADER.size)
+
+    def get_window(self, start_time, end_time):
+        """
+        Selects the records overlapping the time window [start_time, end_time]. The chunk index narrows the search
+        to the chunks covering the window before searching the start times of their records. The records of the
+        window are copied, so the view stays valid after the reader is closed.
+
+        :return: a TraceView over the records of the window
+        """
+        first_chunk = max(0, bisect_right(self.chunk_starts, start_time) - 1)
+        last_chunk = bisect_right(self.chunk_starts, end_time)
+        chunk_first = first_chunk * self.chunk_size
+        chunk_last = min(len(self.records), last_chunk * self.chunk_size)
+
+        starts = self.records['start'][chunk_first:chunk_last]
+        first = chunk_first + max(0, int(starts.searchsorted(start_time, side='right')) - 1)
+        last = chunk_first + int(starts.searchsorted(end_time, side='right'))
+        return TraceView(self.records[first:last].copy(), self.labels)
+
+    def get_view(self):
+        """
+        :return: a TraceView over all the records, sharing the memory of the file
+        """
+        return TraceView(self.records, self.labels)
+
+    def close(self):
+        self.records = None
+        try:
+            self.mmap.close()
+        except BufferError:
+            # A view from get_view still uses the memory of the file, which is unmapped once the view is freed
+            pass
+
+    def __len__(self):
+        return len(self.records)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class TraceView:
+    """
+    Exposes a slice of the records of a trace with the same columns as History, so that it can be drawn.
+    """
+
+    def __init__(self, records, labels):
+        self.starts = records['start']
+        self.durations = records['duration']
+        self.task_ids = records['task']
+        self.execution_types = records['type']
+        self.label_codes = records['label']
+        self.labels = labels
+
+    def get_label(self, index):
+        return self.labels[self.label_codes[index]]
+
+    def __len__(self):
+        return len(self.starts)
+
+
+def get_record_dtype():
+    import numpy as np
+
+    return np.dtype([('start', '<f8'), ('duration', '<f8'), ('task', '<i4'), ('type', 'i1'), ('label', '<i2')])
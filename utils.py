@@ -2,8 +2,10 @@ import sys
 from math import gcd, sqrt
 from enum import Enum
 import argparse
+import os
 
 PHI = (1 + sqrt(5)) / 2
+CORPUS_EXTENSIONS = ['.jsonl', '.npz']
 
 
 class ExecutionType(Enum):
@@ -19,16 +21,86 @@ class SchedulerType(Enum):
     RM = 1
     EDF = 2
 
+
+class Schedulability(Enum):
+    SCHEDULABLE = 1
+    NOT_SCHEDULABLE = 2
+    INCONCLUSIVE = 3
+
+
+class Bound(Enum):
+    IDLE_INSTANT = 1
+    HYPERPERIOD = 2
+
+
+class ArgumentsHelpFormatter(argparse.HelpFormatter):
+    """
+    Shows the optional START of -draw, which argparse cannot express with nargs.
+    """
+
+    def _format_args(self, action, default_metavar):
+        if action.dest == 'draw':
+            return 'OUTPUT [START] END'
+        return super()._format_args(action, default_metavar)
+
+
+def parse_draw_interval(parser, draw):
+    """
+    :return: the START and END of the -draw argument, START being 0 when only END is given
+    """
+    if len(draw) not in (2, 3):
+        parser.error("-draw expects OUTPUT END or OUTPUT START END")
+    try:
+        bounds = [int(value) for value in draw[1:]]
+    except ValueError:
+        parser.error("-draw expects integer START and END")
+    start, end = bounds if len(bounds) == 2 else [0] + bounds
+    if not 0 <= start < end:
+        parser.error("-draw expects 0 <= START < END")
+    return start, end
+
+
 def parse_arguments():
-    parser = argparse.ArgumentParser()
+    parser = argparse.ArgumentParser(formatter_class=ArgumentsHelpFormatter)
     parser.add_argument("-input",
-                        help="Filename of the system settings including the task set, algorithm and overheads",
+                        help="Filename of the system settings including the task set, algorithm and overheads, or of "
+                             "a JSONL or NPZ corpus of such scenarios",
                         required=True)
+    parser.add_argument("-events",
+                        help="Use the event-driven engine which skips the ticks where nothing can happen",
+                        action="store_true")
+    parser.add_argument("-cycle",
+                        help="Search the first repetition of the complete scheduler state instead of the simulation "
+                             "interval",
+                        action="store_true")
+    parser.add_argument("-bound",
+                        help="Stop at a repetition of the state of the scheduler at an idle instant, which proves "
+                             "that the deadlines are met, instead of searching the simulation interval",
+                        action="store_true")
+    parser.add_argument("-analysis",
+                        help="Run the analytical schedulability tests first and only simulate if they are inconclusive",
+                        action="store_true")
+    parser.add_argument("-trace",
+                        metavar='FILE',
+                        help="Filename of a binary trace file to which the schedule is streamed during the simulation")
+    parser.add_argument("-stats",
+                        help="Print the response times, preemptions and processor shares of the simulated tasks",
+                        action="store_true")
+    parser.add_argument("-cache",
+                        metavar='DIR',
+                        help="Directory keeping the results of the simulations between runs, the same task set with "
+                             "the same overheads being answered without simulating again")
+    parser.add_argument("-checkpoint",
+                        metavar='FILE',
+                        help="Filename to which the state of the simulator is saved at every hyperperiod boundary")
+    parser.add_argument("-resume",
+                        metavar='FILE',
+                        help="Filename of a checkpoint from which the simulation is resumed instead of starting at 0")
     group = parser.add_argument_group('draw arguments')
     parser.add_argument("-draw",
-                        nargs=2,
-                        metavar=('OUTPUT', 'INTERVAL'),
-                        help="Filename of the output image and the time interval for the simulation")
+                        nargs='+',
+                        help="Filename of the output image and the time interval for the simulation, either END to "
+                             "draw [0, END] or START END to only record and draw the window [START, END]")
     group.add_argument("-ticks",
                        help="Specify if you want to display the ticks on the schedule",
                        action="store_true")
@@ -36,13 +108,47 @@ def parse_arguments():
                        help="Specify if you want to display the hyperperiods on the schedule",
                        action="store_true")
     group.add_argument("-labels",
-                       help="Specify if you want to display the overheads labels",
+                       help="Specify if you want to display the overheads labels, in a png the labels overlapping "
+                            "the previous one of their row are skipped",
+                       action="store_true")
+    group.add_argument("-exact",
+                       help="Draw every entry of the schedule even when the interval is too long for them to be "
+                            "visible, instead of aggregating the schedule per pixel",
                        action="store_true")
+    group.add_argument("-format",
+                       choices=['png', 'svg', 'html'],
+                       default='png',
+                       help="Format of the output image: png drawn with matplotlib, or svg and html (an SVG viewer with "
+                            "pan and zoom) written directly from the schedule")
+    group.add_argument("-pages",
+                       metavar='WIDTH',
+                       type=int,
+                       help="Split the drawing into pages of WIDTH time units saved to OUTPUT_000.png, OUTPUT_001.png, "
+                            "... with an index in OUTPUT_index.html")
+    group.add_argument("-workers",
+                       metavar='N',
+                       type=int,
+                       help="Number of processes drawing the pages, all the cores by default")
     args = parser.parse_args()
+    if args.draw:
+        args.draw_start, args.draw_end = parse_draw_interval(parser, args.draw)
+    if args.bound and args.cycle:
+        parser.error("-bound and -cycle cannot be used together")
+    if args.pages is not None and args.pages <= 0:
+        parser.error("-pages expects a positive width")
+    if is_corpus(args.input) and (args.draw or args.trace or args.checkpoint or args.resume):
+        parser.error("-draw, -trace, -checkpoint and -resume cannot be used with a corpus of scenarios")
     group.required = '-draw' in sys.argv
     return args
 
 
+def is_corpus(filename):
+    """
+    Checks the extension only, so the corpus module is imported when a corpus is actually read.
+    """
+    return os.path.splitext(filename)[1] in CORPUS_EXTENSIONS
+
+
 def parse_input_file(filename: str):
     with open(filename) as f:
         lines = f.readlines()
@@ -62,13 +168,7 @@ def parse_input_file(filename: str):
             break
         task_set_lines.append(lines[i])
 
-    task_set = []
-    for idx, task in enumerate(task_set_lines):
-        from task import Task
-        task_params = task.split()
-        task_set.append(
-            Task(len(task_set_lines) - idx, float(task_params[0]), float(task_params[1]), float(task_params[2]), float(task_params[3]),
-                 float(task_params[4])))
+    task_set = create_task_set([task.split() for task in task_set_lines])
 
     # Parse scheduling algorithm
     if lines[task_set_end_at_line + 1] != "Algorithm\n":
@@ -105,8 +205,25 @@ def parse_input_file(filename: str):
         key, value = overhead_line.strip().split(' = ')
         overheads[key] = float(value)
 
+    return task_set, algorithm, overheads
+
+
+def create_task_set(task_parameters):
+    """
+    Creates the tasks from their parameters (offset, WCET, period, deadline, initialization overhead) given in the
+    order of the input file, the first task being named after the number of tasks.
+
+    :return: a TaskSet
+    """
+    from task import Task
     from task_set import TaskSet
-    return TaskSet(task_set), algorithm, overheads
+
+    tasks = []
+    for idx, task_params in enumerate(task_parameters):
+        tasks.append(
+            Task(len(task_parameters) - idx, float(task_params[0]), float(task_params[1]), float(task_params[2]),
+                 float(task_params[3]), float(task_params[4])))
+    return TaskSet(tasks)
 
 
 
@@ -132,3 +249,12 @@ def calculate_hyperperiod(tasksList):
     for i in periods:
         lcm = lcm * i // gcd(lcm, i)
     return lcm
+
+
+def ceil_div(a, b):
+    """
+    Computes the ceiling of a / b without going through floats.
+
+    :return: the smallest integer greater than or equal to a / b
+    """
+    return -(-a // b)